@@ -12,6 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .agent import root_agent
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # Resolved lazily (PEP 562) so importing a submodule such as app.cache
+    # doesn't build the whole agent tree.
+    if name == "root_agent":
+        from .agent import root_agent
+
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["root_agent"]
@@ -0,0 +1,69 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""One-time process setup shared by every module that talks to Google Cloud."""
+
+import functools
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.utils.llm import SharedClientGemini
+
+
+@functools.lru_cache(maxsize=1)
+def get_project_id() -> str:
+    """Resolve the Google Cloud project once per process.
+
+    Returns:
+        GOOGLE_CLOUD_PROJECT when it is set, which skips credential discovery,
+        otherwise the project of the application default credentials.
+    """
+    project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
+    if project_id:
+        return project_id
+    import google.auth
+
+    _, project_id = google.auth.default()
+    return project_id
+
+
+@functools.lru_cache(maxsize=1)
+def ensure_env() -> str:
+    """Set the Vertex AI environment defaults used by the agents.
+
+    Returns:
+        The Google Cloud project ID
+    """
+    project_id = get_project_id()
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
+    os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
+    os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
+    return project_id
+
+
+@functools.cache
+def get_model(name: str) -> "SharedClientGemini":
+    """Return the process-wide model instance for a Gemini model name.
+
+    Args:
+        name: The Gemini model name, e.g. gemini-2.5-flash
+
+    Returns:
+        A model that every agent using it shares, along with its HTTP client
+    """
+    from app.utils.llm import SharedClientGemini
+
+    ensure_env()
+    return SharedClientGemini(model=name)
@@ -13,26 +13,113 @@
 # limitations under the License.
 
 """Ultimate Multi-Agent Problem Solver for Hackathon: Role-Based, Web-Grounded, Iterative, and Visual."""
-import datetime
+import functools
+import logging
 import os
-import re
-import copy
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
-from google.adk import Agent
-from google.adk.agents import SequentialAgent
-from google.adk.tools import google_search
-from google.adk.agents.callback_context import CallbackContext
-from google.adk.models import LlmResponse
-
-from zoneinfo import ZoneInfo
-import google.auth
- 
-# Configure Google project
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app._bootstrap import get_model
+from app.cache import get_embedder, get_response_cache
+from app.utils.compression import compress_prompt
+from app.utils.patterns import PatternScanner
+
+# google.adk takes seconds to import, so it is only loaded once the agent tree
+# is built (see build_root_agent) or a tool stub is called.
+if TYPE_CHECKING:
+    from google.adk import Agent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models import LlmRequest, LlmResponse
+    from google.adk.tools.agent_tool import AgentTool
+
+    from app.orchestrator import ParallelEarlyTerminationAgent
+
+# Signals looked for in fact check and conflict resolution output, matched in
+# a single pass over the text. Hyperscan has no lookbehind, so a negated
+# verification is its own signal rather than an exclusion in claims_verified.
+OUTPUT_SIGNALS = PatternScanner(
+    {
+        "claims_verified": r"all critical claims verified",
+        "claims_not_verified": r"\bnot all critical claims (are |were )?verified",
+        "no_conflicts": r"no conflicts",
+        "conflict": r"conflict",
+        "contradicts": r"contradict",
+        "inconsistent": r"inconsistent",
+    }
+)
+
+# Every pipeline agent shares the model and, unless it opts out, web search.
+AGENT_MODEL = "gemini-2.5-flash"
+
+
+def compress_response(
+    callback_context: "CallbackContext", llm_response: "LlmResponse"
+) -> None:
+    """Compress an agent's final response before it is recorded.
+
+    Compressing the response itself, rather than only the copy saved under
+    ``output_key``, shrinks both the state that downstream instructions read
+    and the conversation history sent along with them. The response is
+    changed in place, so callbacks after this one (the response cache) see the
+    compressed text as well. Without LLMLingua the response is shortened by
+    the extractive summary, which keeps headings and list items.
+    """
+    content = llm_response.content
+    if llm_response.partial or not content or not content.parts:
+        return
+    if any(part.function_call for part in content.parts):
+        return
+    for part in content.parts:
+        if part.text and not part.thought:
+            part.text = compress_prompt(part.text, extractive=True)
+
+
+def _callbacks(callback: Callable | list[Callable] | None) -> list[Callable]:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def make_agent(
+    name: str,
+    instruction: str,
+    tools: Sequence | None = None,
+    compress_output: bool = True,
+    **kwargs: Any,
+) -> "Agent":
+    """Build a pipeline agent that stores its output in state under its name.
+
+    Agents get web search unless ``tools`` is given. Pass ``output_key=None``
+    for an agent whose output shouldn't be saved to state. Model callbacks
+    passed in run before the shared ones, and every agent's model calls go
+    through the response cache.
+    """
+    from google.adk import Agent
+    from google.adk.tools import google_search
+
+    response_cache = get_response_cache()
+    before_model = [
+        *_callbacks(kwargs.pop("before_model_callback", None)),
+        response_cache.before_model,
+    ]
+    after_model = [compress_response] if compress_output else []
+    after_model += _callbacks(kwargs.pop("after_model_callback", None))
+    if tools is None:
+        tools = (google_search,)
+    # Last, so it stores the response every other callback has settled on.
+    after_model.append(response_cache.after_model)
+    kwargs["before_model_callback"] = before_model
+    kwargs["after_model_callback"] = after_model
+    kwargs.setdefault("output_key", name)
+    return Agent(
+        name=name,
+        instruction=instruction,
+        tools=list(tools),
+        model=get_model(AGENT_MODEL),
+        **kwargs,
+    )
 
 # -----------------------------
 # Agent: Data Collector
@@ -42,23 +129,19 @@ You are a research agent. Collect structured data, statistics, case studies, and
 to the provided problem statement. Use trusted sources and provide citations for each fact.
 """
 
-def collect_problem_data(problem_statement: str) -> str:
-    return LlmResponse(f"""
+_DATA_COLLECTION_TEMPLATE = """
     Data Collection:
     Problem Statement: {problem_statement}
-    
+
     Collected Context:
     - Key statistics: Example stats from global reports
     - Relevant case studies: Referenced from domain sources
     - Benchmarks and best practices: Summarized from web search
-    """)
+    """
+
+def collect_problem_data(problem_statement: str) -> str:
+    return _DATA_COLLECTION_TEMPLATE.format(problem_statement=problem_statement)
 
-data_collector_agent = Agent(
-    model="gemini-2.5-flash",
-    name="data_collector_agent",
-    instruction=DATA_COLLECTION_PROMPT,
-    tools=[google_search],
-)
 
 # -----------------------------
 # Agent: Role Identifier
@@ -66,236 +149,476 @@ data_collector_agent = Agent(
 ROLE_IDENTIFICATION_PROMPT = """
 You are a world-class strategist. Based on the problem statement and collected data, dynamically identify 
 all required expertise roles to solve it. Provide reasoning for each role.
+
+Collected data:
+{data_collector_agent}
 """
 
-def identify_roles(problem_context: str) -> str:
-    return LlmResponse(f"""
+_ROLES_TEMPLATE = """
     Problem Context: {problem_context}
-    
+
     Dynamically Identified Roles:
     - Technical Expert
     - Domain Specialist
     - UX Consultant
     - Regulatory Advisor
     - Strategy Analyst
-    """)
+    """
+
+def identify_roles(problem_context: str) -> str:
+    return _ROLES_TEMPLATE.format(problem_context=problem_context)
 
-role_identifier_agent = Agent(
-    model="gemini-2.5-flash",
-    name="role_identifier_agent",
-    instruction=ROLE_IDENTIFICATION_PROMPT,
-    tools=[google_search],
-)
 
 # -----------------------------
 # Agent: Prompt Generator
 # -----------------------------
 ROLE_PROMPT_GENERATION = """
 Generate advanced, evidence-based prompts for each identified role to analyze the problem effectively.
+
+Identified roles:
+{role_identifier_agent}
 """
 
-def generate_role_prompts(roles: str) -> str:
-    return LlmResponse(f"""
+_ROLE_PROMPTS_TEMPLATE = """
     Role Prompts Generated:
     {roles}
-    
+
     Prompts:
     - Technical Expert Prompt: Analyze technical feasibility.
     - Domain Specialist Prompt: Identify domain-specific constraints.
     - UX Consultant Prompt: Assess usability and user impact.
     - Regulatory Advisor Prompt: Highlight compliance risks.
     - Strategy Analyst Prompt: Evaluate long-term strategic impact.
-    """)
+    """
+
+def generate_role_prompts(roles: str) -> str:
+    return _ROLE_PROMPTS_TEMPLATE.format(roles=roles)
 
-prompt_generator_agent = Agent(
-    model="gemini-2.5-flash",
-    name="prompt_generator_agent",
-    instruction=ROLE_PROMPT_GENERATION,
-    tools=[google_search],
-)
 
 # -----------------------------
 # Agent: Role Thought Collector
 # -----------------------------
 ROLE_THOUGHT_COLLECTION_PROMPT = """
-For each role prompt, provide thorough, evidence-backed reasoning. Cite references using web search if necessary.
+For each role prompt, provide thorough, evidence-backed reasoning.
+Call every analyze_as_* tool in a single turn, as parallel function calls, passing each tool the prompt
+generated for its role. Then combine their results into the reasoning for each role, keeping the references.
+
+Role prompts:
+{prompt_generator_agent}
 """
 
+class RoleThoughts(BaseModel):
+    """Structured output of the role thought collection step."""
+
+    thoughts: dict[str, str] = Field(description="Referenced reasoning per role.")
+
+_ROLE_THOUGHTS = RoleThoughts(
+    thoughts={
+        "Technical Expert": "Scalability, reliability, modern tech stack. [Ref: Tech sources]",
+        "Domain Specialist": "Domain constraints and opportunities. [Ref: Domain sources]",
+        "UX Consultant": "Usability and accessibility. [Ref: UX research]",
+        "Regulatory Advisor": "Compliance obligations. [Ref: Regulatory sources]",
+        "Strategy Analyst": "Long-term strategic impact. [Ref: Strategy sources]",
+    }
+).model_dump_json()
+
 def collect_role_thoughts(role_prompts: str) -> str:
-    return LlmResponse(f"""
-    Collected Role Thoughts:
-    - Technical Expert: Scalability, reliability, modern tech stack. [Ref: Tech sources]
-    - Domain Specialist: Domain constraints and opportunities. [Ref: Domain sources]
-    - UX Consultant: Usability and accessibility. [Ref: UX research]
-    - Regulatory Advisor: Compliance obligations. [Ref: Regulatory sources]
-    - Strategy Analyst: Long-term strategic impact. [Ref: Strategy sources]
-    """)
-
-role_thought_collector_agent = Agent(
-    model="gemini-2.5-flash",
-    name="role_thought_collector_agent",
-    instruction=ROLE_THOUGHT_COLLECTION_PROMPT,
-    tools=[google_search],
+    return _ROLE_THOUGHTS
+
+
+# One tool per role lets the model request all five analyses in a single turn
+# instead of working through the roles one response at a time. Each tool is a
+# search-grounded agent of its own: built-in search can't be declared next to
+# function tools, but an agent wrapped as a tool can use it.
+ROLE_ANALYSIS_PROMPT = """
+You are the {role} on a problem-solving team. Analyze the request from that perspective,
+focusing on {focus}. Ground every claim in web search results and cite its source.
+"""
+
+ROLE_ANALYSTS = {
+    "analyze_as_technical_expert": (
+        "Technical Expert",
+        "technical feasibility: scalability, reliability and the tech stack",
+    ),
+    "analyze_as_domain_specialist": (
+        "Domain Specialist",
+        "domain constraints and opportunities",
+    ),
+    "analyze_as_ux_consultant": ("UX Consultant", "usability and accessibility"),
+    "analyze_as_regulatory_advisor": (
+        "Regulatory Advisor",
+        "compliance obligations and legal risks",
+    ),
+    "analyze_as_strategy_analyst": (
+        "Strategy Analyst",
+        "long-term strategic impact",
+    ),
+}
+
+
+def make_role_analysis_tools() -> list["AgentTool"]:
+    """Build one search-grounded analysis tool per role in ROLE_ANALYSTS."""
+    from google.adk.tools.agent_tool import AgentTool
+
+    return [
+        AgentTool(
+            agent=make_agent(
+                name,
+                ROLE_ANALYSIS_PROMPT.format(role=role, focus=focus),
+                # The caller combines the results and needs every reference.
+                compress_output=False,
+                output_key=None,
+                description=f"Analyze the problem from the {role}'s perspective.",
+            )
+        )
+        for name, (role, focus) in ROLE_ANALYSTS.items()
+    ]
+
+
+# How each role's tool is recognized in the role identifier's output.
+ROLE_SIGNALS = PatternScanner(
+    {
+        "analyze_as_technical_expert": r"technical|engineer",
+        "analyze_as_domain_specialist": r"domain",
+        "analyze_as_ux_consultant": r"\bux\b|user experience|usability",
+        "analyze_as_regulatory_advisor": r"regulat|compliance|legal",
+        "analyze_as_strategy_analyst": r"strateg",
+    }
 )
 
+
+def route_role_tools(
+    callback_context: "CallbackContext", llm_request: "LlmRequest"
+) -> None:
+    """Declare only the analysis tools for roles the role identifier named.
+
+    Unused tool schemas would otherwise be sent with every model call. All
+    tools are kept when no role is recognized.
+    """
+    roles = str(callback_context.state.get("role_identifier_agent", ""))
+    selected = ROLE_SIGNALS.scan(roles)
+    if not selected:
+        return
+    for tool in llm_request.config.tools or ():
+        if tool.function_declarations:
+            tool.function_declarations = [
+                declaration
+                for declaration in tool.function_declarations
+                if declaration.name in selected
+            ]
+    for name in set(llm_request.tools_dict) - selected:
+        del llm_request.tools_dict[name]
+
+
 # -----------------------------
 # Agent: Fact Checker
 # -----------------------------
 FACT_CHECK_PROMPT = """
 Verify all role thoughts for factual accuracy and reference validity using web search.
 Flag any inconsistencies or unverifiable claims.
+If every critical claim holds, include the exact sentence "All critical claims verified".
+
+Role thoughts:
+{role_thought_collector_agent}
 """
 
-def fact_check_role_thoughts(role_thoughts: str) -> str:
-    return LlmResponse(f"""
+_FACT_CHECK_TEMPLATE = """
     Fact Check Results:
     - All critical claims verified
     - Minor references updated
     - All role outputs validated
-    """)
+    """
+
+def fact_check_role_thoughts(role_thoughts: str) -> str:
+    return _FACT_CHECK_TEMPLATE
 
-fact_checker_agent = Agent(
-    model="gemini-2.5-flash",
-    name="fact_checker_agent",
-    instruction=FACT_CHECK_PROMPT,
-    tools=[google_search],
-)
 
 # -----------------------------
-# Agent: Conflict Resolver (Iterative)
+# Agent: Conflict Resolver (Single Pass)
 # -----------------------------
 CONFLICT_RESOLUTION_PROMPT = """
-Check all role thoughts for contradictions, overlaps, or gaps. Request revisions iteratively if conflicts are detected.
+Check all role thoughts for contradictions, overlaps, or gaps and resolve them in a single pass.
+Reply with JSON only: list every conflict you found in "conflicts" (empty if there are none)
+and give the reconciled role thoughts in "resolved_thoughts".
+
+Role thoughts:
+{role_thought_collector_agent}
 """
 
-def resolve_conflicts(role_thoughts: str, max_iterations: int = 3) -> str:
-    iteration = 0
-    current_thoughts = role_thoughts
-    while iteration < max_iterations:
-        conflicts_detected = "No conflicts" not in current_thoughts
-        if not conflicts_detected:
-            return f"Conflict Check: No conflicts after {iteration} iterations."
-        current_thoughts = collect_role_thoughts(current_thoughts)
-        iteration += 1
-    return LlmResponse(f"Conflict Check: Conflicts resolved after {iteration} iterations.")
-
-conflict_resolution_agent = Agent(
-    model="gemini-2.5-flash",
-    name="conflict_resolution_agent",
-    instruction=CONFLICT_RESOLUTION_PROMPT,
-    tools=[google_search],
-)
+class ConflictReport(BaseModel):
+    """Structured output of the conflict resolution agent."""
+
+    conflicts: list[str] = Field(
+        default_factory=list, description="Contradictions, overlaps, or gaps found."
+    )
+    resolved_thoughts: str = Field(description="Role thoughts with conflicts resolved.")
+
+# Signals that mark a role thought as disagreeing with another.
+CONFLICT_SIGNALS = frozenset({"conflict", "contradicts", "inconsistent"})
+
+def resolve_conflicts(role_thoughts: str) -> str:
+    """Report the role thoughts that flag a conflict, without calling a model.
+
+    Args:
+        role_thoughts: RoleThoughts JSON, or plain text with one thought per line
+    """
+    try:
+        thoughts = RoleThoughts.model_validate_json(role_thoughts).thoughts
+        statements = [f"{role}: {thought}" for role, thought in thoughts.items()]
+    except ValidationError:
+        statements = role_thoughts.splitlines()
+    conflicts = []
+    for statement in statements:
+        signals = OUTPUT_SIGNALS.scan(statement)
+        if signals & CONFLICT_SIGNALS and "no_conflicts" not in signals:
+            conflicts.append(statement.strip())
+    return ConflictReport(
+        conflicts=conflicts, resolved_thoughts=role_thoughts
+    ).model_dump_json()
+
+
+def validate_conflict_report(
+    callback_context: "CallbackContext", llm_response: "LlmResponse"
+) -> "LlmResponse | None":
+    """Replace a conflict resolution reply that isn't a valid ConflictReport.
+
+    ADK parses the output_schema reply when saving it to state and fails the
+    whole pipeline run if it doesn't validate, so a malformed reply is swapped
+    for the report resolve_conflicts builds from the role thoughts.
+    """
+    content = llm_response.content
+    if llm_response.partial or not content or not content.parts:
+        return None
+    # Joined the same way ADK joins the parts before parsing them.
+    text = "".join(part.text or "" for part in content.parts)
+    if not text.strip():
+        return None
+    try:
+        ConflictReport.model_validate_json(text)
+        return None
+    except ValidationError as e:
+        logging.warning(f"Invalid conflict report, rebuilding it from the thoughts: {e}")
+    from google.genai import types
+
+    role_thoughts = str(callback_context.state.get("role_thought_collector_agent", ""))
+    report = resolve_conflicts(role_thoughts)
+    return llm_response.model_copy(
+        update={"content": types.Content(role="model", parts=[types.Part(text=report)])}
+    )
+
 
 # -----------------------------
 # Agent: Simulation / Scenario Tester
 # -----------------------------
 SIMULATION_PROMPT = """
 Simulate multiple scenarios for the proposed solutions. Highlight strengths, weaknesses, and risks under different conditions.
+
+Role thoughts:
+{role_thought_collector_agent}
 """
 
-def run_simulations(role_thoughts: str) -> str:
-    return LlmResponse(f"""
+_SIMULATION_TEMPLATE = """
     Simulation Results:
     - Scenario 1: Feasible, low risk
     - Scenario 2: Medium risk, needs mitigation
     - Scenario 3: High impact, moderate feasibility
-    """)
+    """
+
+def run_simulations(role_thoughts: str) -> str:
+    return _SIMULATION_TEMPLATE
 
-simulation_agent = Agent(
-    model="gemini-2.5-flash",
-    name="simulation_agent",
-    instruction=SIMULATION_PROMPT,
-    tools=[google_search],
-)
 
 # -----------------------------
 # Agent: Prioritization / Scoring
 # -----------------------------
 SCORING_PROMPT = """
 Evaluate and rank all solutions based on feasibility, impact, novelty, and confidence scores.
+
+Simulation results:
+{simulation_agent}
 """
 
-def score_solutions(simulation_results: str) -> str:
-    return LlmResponse(f"""
+_SCORES_TEMPLATE = """
     Ranked Solutions:
     1. Solution A (Confidence: High, Feasibility: 9/10)
     2. Solution B (Confidence: Medium, Feasibility: 7/10)
     3. Solution C (Confidence: Medium-Low, Feasibility: 6/10)
-    """)
+    """
+
+def score_solutions(simulation_results: str) -> str:
+    return _SCORES_TEMPLATE
 
-scoring_agent = Agent(
-    model="gemini-2.5-flash",
-    name="scoring_agent",
-    instruction=SCORING_PROMPT,
-    tools=[google_search],
-)
 
 # -----------------------------
 # Agent: Final Solution Synthesizer
 # -----------------------------
 FINAL_SYNTHESIS_PROMPT = """
 Integrate verified, conflict-free, and prioritized role thoughts into a detailed, stakeholder-ready report.
+
+Prioritized solutions:
+{scoring_agent}
+
+Fact check:
+{fact_checker_agent}
+
+Conflict resolution:
+{conflict_resolution_agent}
 """
 
-def synthesize_final_solution(prioritized_solutions: str) -> str:
-    return LlmResponse(f"""
+_FINAL_SOLUTION_TEMPLATE = """
     === FINAL INTEGRATED SOLUTION ===
     {prioritized_solutions}
-    
+
     - All role perspectives integrated
     - Actionable recommendations provided
     - References and risk considerations included
-    """)
+    """
+
+def synthesize_final_solution(prioritized_solutions: str) -> str:
+    return _FINAL_SOLUTION_TEMPLATE.format(prioritized_solutions=prioritized_solutions)
 
-final_solution_agent = Agent(
-    model="gemini-2.5-flash",
-    name="final_solution_agent",
-    instruction=FINAL_SYNTHESIS_PROMPT,
-    tools=[google_search],
-)
 
 # -----------------------------
 # Agent: Visualization / Dashboard Generator
 # -----------------------------
 VISUALIZATION_PROMPT = """
 Convert the final solution into dashboards, charts, and multi-perspective visual outputs for presentation.
+
+Final solution:
+{final_solution_agent}
 """
 
-def generate_visuals(final_solution: str) -> str:
-    return LlmResponse(f"""
+_VISUALS_TEMPLATE = """
     Dashboard Generated:
     - Side-by-side role insights
     - Confidence and feasibility heatmaps
     - Risk and mitigation charts
-    """)
+    """
+
+def generate_visuals(final_solution: str) -> str:
+    return _VISUALS_TEMPLATE
 
-visualization_agent = Agent(
-    model="gemini-2.5-flash",
-    name="visualization_agent",
-    instruction=VISUALIZATION_PROMPT,
-)
 
 # -----------------------------
 # Root Agent: Orchestrator
 # -----------------------------
-ultimate_role_based_solver = SequentialAgent(
-    name="ultimate_role_based_solver",
-    description=(
-        "Full-fledged multi-agent system for dynamic problem solving with web-grounded reasoning, "
-        "iterative conflict resolution, simulation, scoring, and visual dashboards."
-    ),
-    sub_agents=[
-        data_collector_agent,
-        role_identifier_agent,
-        prompt_generator_agent,
-        role_thought_collector_agent,
-        fact_checker_agent,
-        conflict_resolution_agent,
-        simulation_agent,
-        scoring_agent,
-        final_solution_agent,
-        visualization_agent,
+# Each agent waits only for the agents whose output it reads, so independent
+# stages (fact checking, conflict resolution, simulation) run concurrently.
+PIPELINE_DEPENDENCIES = {
+    "role_identifier_agent": ["data_collector_agent"],
+    "prompt_generator_agent": ["role_identifier_agent"],
+    "role_thought_collector_agent": ["prompt_generator_agent"],
+    "fact_checker_agent": ["role_thought_collector_agent"],
+    "conflict_resolution_agent": ["role_thought_collector_agent"],
+    "simulation_agent": ["role_thought_collector_agent"],
+    "scoring_agent": ["simulation_agent"],
+    "final_solution_agent": [
+        "scoring_agent",
+        "fact_checker_agent",
+        "conflict_resolution_agent",
     ],
-)
-
-root_agent = ultimate_role_based_solver
+    "visualization_agent": ["final_solution_agent"],
+}
+
+# The final synthesis can start on the simulation results while scoring is
+# still running, and is kept if the ranked solutions turn out close to them.
+# Rankings rarely match the raw simulations closely, so this only pays off with
+# an embedding model; it is off unless SOLVER_SPECULATE=true, and the DAG logs
+# whether each speculation was kept so the hit rate can be checked first.
+PIPELINE_SPECULATIONS = {
+    "final_solution_agent": {"scoring_agent": "simulation_agent"},
+}
+
+
+def pipeline_speculations() -> dict[str, dict[str, str]]:
+    """Return the speculations to run, or none when they can't pay off."""
+    if os.environ.get("SOLVER_SPECULATE", "false").lower() != "true":
+        return {}
+    if get_embedder() is None:
+        logging.warning(
+            "SOLVER_SPECULATE is set but no embedding model is installed; "
+            "speculation is disabled"
+        )
+        return {}
+    return PIPELINE_SPECULATIONS
+
+def fact_check_passed(state: dict) -> bool:
+    """Accept a pipeline run only if the fact checker verified its claims."""
+    signals = OUTPUT_SIGNALS.scan(str(state.get("fact_checker_agent", "")))
+    return "claims_verified" in signals and "claims_not_verified" not in signals
+
+@functools.cache
+def build_root_agent() -> "ParallelEarlyTerminationAgent":
+    """Build the agent tree on first use instead of at import time."""
+    from app.orchestrator import ParallelDAGAgent, ParallelEarlyTerminationAgent
+
+    ultimate_role_based_solver = ParallelDAGAgent(
+        name="ultimate_role_based_solver",
+        description=(
+            "Full-fledged multi-agent system for dynamic problem solving with web-grounded reasoning, "
+            "iterative conflict resolution, simulation, scoring, and visual dashboards."
+        ),
+        sub_agents=[
+            make_agent("data_collector_agent", DATA_COLLECTION_PROMPT),
+            # Left uncompressed so route_role_tools and the prompt generator
+            # see every role name.
+            make_agent(
+                "role_identifier_agent",
+                ROLE_IDENTIFICATION_PROMPT,
+                compress_output=False,
+            ),
+            make_agent("prompt_generator_agent", ROLE_PROMPT_GENERATION),
+            # Web search happens inside the per-role analysis tools.
+            make_agent(
+                "role_thought_collector_agent",
+                ROLE_THOUGHT_COLLECTION_PROMPT,
+                tools=make_role_analysis_tools(),
+                before_model_callback=route_role_tools,
+            ),
+            # Left uncompressed so fact_check_passed can find its marker.
+            make_agent(
+                "fact_checker_agent", FACT_CHECK_PROMPT, compress_output=False
+            ),
+            # Structured output can't be combined with tools, so this agent
+            # reasons over the collected thoughts without web search.
+            make_agent(
+                "conflict_resolution_agent",
+                CONFLICT_RESOLUTION_PROMPT,
+                tools=(),
+                compress_output=False,
+                output_schema=ConflictReport,
+                after_model_callback=validate_conflict_report,
+            ),
+            make_agent("simulation_agent", SIMULATION_PROMPT),
+            make_agent("scoring_agent", SCORING_PROMPT),
+            make_agent(
+                "final_solution_agent", FINAL_SYNTHESIS_PROMPT, compress_output=False
+            ),
+            make_agent(
+                "visualization_agent",
+                VISUALIZATION_PROMPT,
+                tools=(),
+                compress_output=False,
+            ),
+        ],
+        dependencies=PIPELINE_DEPENDENCIES,
+        speculations=pipeline_speculations(),
+    )
+
+    # Run several pipelines at once and keep the first one that passes fact checking.
+    # SOLVER_SAMPLES=1 runs a single pipeline; SOLVER_AGGREGATE=true votes across all runs.
+    return ParallelEarlyTerminationAgent(
+        name="parallel_role_based_solver",
+        description=ultimate_role_based_solver.description,
+        sub_agents=[ultimate_role_based_solver],
+        n=int(os.environ.get("SOLVER_SAMPLES", "3")),
+        validator=fact_check_passed,
+        aggregate=os.environ.get("SOLVER_AGGREGATE", "false").lower() == "true",
+        vote_key="final_solution_agent",
+    )
+
+
+def __getattr__(name: str) -> "ParallelEarlyTerminationAgent":
+    if name == "root_agent":
+        return build_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,438 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Semantic response cache for the pipeline agents' model calls."""
+
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.trust_kernels import cosine, token_ids, token_jaccard
+
+if TYPE_CHECKING:
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models import LlmRequest, LlmResponse
+
+EMBEDDING_MODEL = os.environ.get(
+    "SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+)
+
+Embedder = Callable[[list[str]], np.ndarray]
+
+
+# Where the int8 ONNX export of the embedding model is kept between runs.
+QUANTIZED_MODEL_DIR = Path(
+    os.environ.get(
+        "SEMANTIC_CACHE_ONNX_DIR",
+        Path.home()
+        / ".cache"
+        / "semantic-cache"
+        / f"{Path(EMBEDDING_MODEL).name}-int8",
+    )
+)
+
+
+def _load_int8_embedder() -> Embedder | None:
+    """Load the embedding model as a dynamically quantized int8 ONNX model.
+
+    The model is exported and quantized on first use and read back from
+    QUANTIZED_MODEL_DIR afterwards.
+
+    Returns:
+        The embedding function, or None when optimum[onnxruntime] is not
+        installed
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+    except ImportError:
+        return None
+
+    if not (QUANTIZED_MODEL_DIR / "model_quantized.onnx").exists():
+        exported = ORTModelForFeatureExtraction.from_pretrained(
+            EMBEDDING_MODEL, export=True, provider="CPUExecutionProvider"
+        )
+        ORTQuantizer.from_pretrained(exported).quantize(
+            save_dir=QUANTIZED_MODEL_DIR,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(
+                is_static=False, per_channel=False
+            ),
+        )
+        AutoTokenizer.from_pretrained(EMBEDDING_MODEL).save_pretrained(
+            QUANTIZED_MODEL_DIR
+        )
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        QUANTIZED_MODEL_DIR,
+        file_name="model_quantized.onnx",
+        provider="CPUExecutionProvider",
+    )
+    tokenizer = AutoTokenizer.from_pretrained(QUANTIZED_MODEL_DIR)
+
+    def embed(texts: list[str]) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), 32):
+            inputs = tokenizer(
+                texts[start : start + 32],
+                padding=True,
+                truncation=True,
+                return_tensors="np",
+            )
+            hidden = model(**inputs).last_hidden_state
+            # Mean pooling over real tokens, as sentence-transformers does.
+            mask = inputs["attention_mask"][..., None]
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled / np.linalg.norm(pooled, axis=1, keepdims=True))
+        return np.concatenate(batches)
+
+    return embed
+
+
+@functools.lru_cache(maxsize=1)
+def get_embedder() -> Embedder | None:
+    """Load the local embedding model used for similarity lookups.
+
+    The int8 ONNX model is preferred when optimum[onnxruntime] is installed;
+    it is about twice as fast on CPU with negligible cosine drift.
+
+    Returns:
+        A function mapping texts to L2-normalized embeddings, or None when
+        neither optimum nor sentence-transformers is installed (exact
+        matching only).
+    """
+    embedder = _load_int8_embedder()
+    if embedder is not None:
+        return embedder
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logging.info(
+            "sentence-transformers not installed, semantic cache falls back "
+            "to exact matching"
+        )
+        return None
+
+    model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+
+    def embed(texts: list[str]) -> np.ndarray:
+        return model.encode(texts, batch_size=32, normalize_embeddings=True)
+
+    return embed
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces embedding requests that arrive within a short window into a
+    single call to the embedding model.
+
+    Pipeline agents running side by side in the DAG, or in parallel samples,
+    that miss the exact-match path of the response cache at about the same
+    time share one batched encode instead of paying for one call each.
+    """
+
+    def __init__(self, embedder: Embedder, window: float = 0.005) -> None:
+        """
+        Initialize the batcher.
+
+        :param embedder: Function embedding a batch of texts
+        :param window: Seconds to wait for more requests before encoding
+        """
+        self.embedder = embedder
+        self.window = window
+        self._pending: list[tuple[str, Future[np.ndarray]]] = []
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future[np.ndarray]:
+        """
+        Queue a text for the next batch.
+
+        :param text: The text to embed
+        :return: A future resolving to the text's embedding
+        """
+        future: Future[np.ndarray] = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._timer = None
+        try:
+            vectors = self.embedder([text for text, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        for (_, future), vector in zip(pending, vectors, strict=True):
+            future.set_result(np.asarray(vector))
+
+
+@functools.lru_cache(maxsize=1)
+def get_batcher() -> EmbeddingBatcher | None:
+    """Return the batcher shared by the response cache and similarity()."""
+    embedder = get_embedder()
+    return None if embedder is None else EmbeddingBatcher(embedder)
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    vector: np.ndarray | None
+    value: Any
+    partition: str = ""
+
+
+def similarity(a: str, b: str) -> float:
+    """Score how close two texts are in meaning.
+
+    Args:
+        a: The first text
+        b: The second text
+
+    Returns:
+        Cosine similarity of the embeddings, or token-set Jaccard overlap when
+        no embedding model is installed.
+    """
+    batcher = get_batcher()
+    if batcher is None:
+        return float(token_jaccard(token_ids(a), token_ids(b)))
+    vector_a, vector_b = batcher.submit(a), batcher.submit(b)
+    return float(cosine(vector_a.result(), vector_b.result()))
+
+
+# Session state key naming the sampling branch a model call belongs to. Forked
+# pipeline samples each set their own, so the response cache never hands one
+# sample's response to another and the samples stay independent.
+CACHE_SCOPE_KEY = "temp:cache_scope"
+
+
+class SemanticCache:
+    """
+    An in-process cache keyed by the meaning of the input text.
+
+    Lookups first try an exact SHA-256 match of the raw text, which skips the
+    embedding model entirely, then fall back to the most similar cached input
+    by cosine similarity. Entries are only compared within their partition,
+    which has to match exactly.
+
+    The before_model/after_model callbacks attach the cache to an agent's
+    model calls, so a request that means the same as an earlier one reuses
+    its response instead of calling the model.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl: float = 3600,
+        maxsize: int = 1024,
+        embedder: Embedder | None = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        :param threshold: Minimum cosine similarity for a semantic hit
+        :param ttl: Seconds an entry stays valid
+        :param maxsize: Maximum number of entries, oldest are evicted first
+        :param embedder: Embedding function, defaults to the local model
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._batcher = EmbeddingBatcher(embedder) if embedder else None
+        self._recent_vectors: dict[str, np.ndarray] = {}
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._matrix: np.ndarray | None = None
+        self._matrix_keys: list[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def batcher(self) -> EmbeddingBatcher | None:
+        return self._batcher or get_batcher()
+
+    @staticmethod
+    def _digest(text: str, partition: str) -> str:
+        return hashlib.sha256(f"{partition}\0{text}".encode()).hexdigest()
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _vectors(self) -> tuple[np.ndarray | None, list[str]]:
+        if self._matrix is None:
+            keys = [k for k, e in self._entries.items() if e.vector is not None]
+            self._matrix_keys = keys
+            self._matrix = (
+                np.stack([self._entries[k].vector for k in keys]) if keys else None
+            )
+        return self._matrix, self._matrix_keys
+
+    def _lookup_exact(self, digest: str, partition: str) -> tuple[bool, Any]:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            entry = self._entries.get(digest)
+            if entry is not None:
+                return True, entry.value
+            in_partition = any(e.partition == partition for e in self._entries.values())
+            return not in_partition, None
+
+    def _lookup_nearest(
+        self, digest: str, partition: str, vector: np.ndarray
+    ) -> Any | None:
+        with self._lock:
+            # Keep the embedding so a following store() doesn't recompute it.
+            if len(self._recent_vectors) >= self.maxsize:
+                self._recent_vectors.clear()
+            self._recent_vectors[digest] = vector
+            matrix, keys = self._vectors()
+            if matrix is None:
+                return None
+            scores = matrix @ vector
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None or entry.partition != partition:
+                    scores[i] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            return self._entries[keys[best]].value
+
+    async def lookup(self, text: str, partition: str = "") -> Any | None:
+        """
+        Return the cached value for the text or a semantically similar one.
+
+        The embedding is awaited without blocking the event loop, so
+        concurrent lookups share one batch.
+
+        :param text: The input text
+        :param partition: Only entries stored under this partition match
+        :return: The cached value, or None on a miss
+        """
+        digest = self._digest(text, partition)
+        done, value = self._lookup_exact(digest, partition)
+        batcher = self.batcher
+        if done or batcher is None:
+            return value
+        vector = await asyncio.wrap_future(batcher.submit(text))
+        return self._lookup_nearest(digest, partition, vector)
+
+    async def store(self, text: str, value: Any, partition: str = "") -> None:
+        """
+        Cache a value for the text.
+
+        :param text: The input text
+        :param value: The value to return for this or similar text
+        :param partition: The partition lookups must name to match
+        """
+        digest = self._digest(text, partition)
+        with self._lock:
+            vector = self._recent_vectors.pop(digest, None)
+        batcher = self.batcher
+        if vector is None and batcher is not None:
+            vector = await asyncio.wrap_future(batcher.submit(text))
+        with self._lock:
+            self._entries[digest] = _Entry(
+                expires_at=time.monotonic() + self.ttl,
+                vector=vector,
+                value=value,
+                partition=partition,
+            )
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    @staticmethod
+    def _request_key(
+        callback_context: "CallbackContext", llm_request: "LlmRequest"
+    ) -> tuple[str, str]:
+        """Split a model request into its opening message and the rest.
+
+        The opening message (the user's problem) is matched by meaning.
+        Everything else, including tool calls and their results, is part of
+        the partition, so a follow-up call in a tool loop never matches the
+        call before it.
+        """
+        contents = llm_request.contents
+        opening = contents[0].parts or () if contents else ()
+        text = "\n".join(part.text for part in opening if part.text)
+        config = llm_request.config
+        partition = "\n".join(
+            [
+                callback_context.agent_name,
+                str(callback_context.state.get(CACHE_SCOPE_KEY, "")),
+                str(config.system_instruction or "") if config else "",
+                *(
+                    content.model_dump_json(exclude_none=True)
+                    for content in contents[1:]
+                ),
+            ]
+        )
+        return text, hashlib.sha256(partition.encode()).hexdigest()
+
+    @staticmethod
+    def _state_key(callback_context: "CallbackContext") -> str:
+        return f"temp:response_cache:{callback_context.agent_name}"
+
+    async def before_model(
+        self, callback_context: "CallbackContext", llm_request: "LlmRequest"
+    ) -> "LlmResponse | None":
+        """Return a cached response, or None to let the model call proceed."""
+        text, partition = self._request_key(callback_context, llm_request)
+        cached = await self.lookup(text, partition)
+        if cached is None:
+            callback_context.state[self._state_key(callback_context)] = [
+                text,
+                partition,
+            ]
+        return cached
+
+    async def after_model(
+        self, callback_context: "CallbackContext", llm_response: "LlmResponse"
+    ) -> None:
+        """Store the response of a call that before_model let through."""
+        if llm_response.partial or llm_response.error_code is not None:
+            return
+        key = callback_context.state.get(self._state_key(callback_context))
+        if key is None:
+            return
+        callback_context.state[self._state_key(callback_context)] = None
+        text, partition = key
+        await self.store(text, llm_response, partition)
+
+
+@functools.lru_cache(maxsize=1)
+def get_response_cache() -> SemanticCache:
+    """Return the response cache shared by every pipeline agent."""
+    return SemanticCache()
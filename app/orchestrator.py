@@ -0,0 +1,346 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Workflow agents used to orchestrate the problem solver pipeline."""
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.sessions import Session, State
+from pydantic import Field, model_validator
+
+from app.cache import CACHE_SCOPE_KEY, similarity
+
+
+def fork_session(session: Session) -> Session:
+    """
+    Copy a session so a speculative run can't touch the real one.
+
+    Only the state dict and the event list are copied. apply_event replaces
+    state values and appends events but never mutates them, so the fork can
+    share them with the original instead of deep-copying every event.
+    """
+    return session.model_copy(
+        update={"state": dict(session.state), "events": list(session.events)}
+    )
+
+
+def apply_event(session: Session, event: Event) -> None:
+    """Record an event on a forked session the way a session service would."""
+    if event.partial:
+        return
+    for key, value in event.actions.state_delta.items():
+        if not key.startswith(State.TEMP_PREFIX):
+            session.state[key] = value
+    session.events.append(event)
+
+
+class ParallelDAGAgent(BaseAgent):
+    """
+    A workflow agent that runs its sub-agents as a dependency graph.
+
+    Each sub-agent starts as soon as every agent it depends on has finished, so
+    independent branches of the graph run concurrently. Sub-agents exchange
+    results through session state: every node writes its output under its own
+    name (``output_key``) and downstream nodes read their inputs by key.
+
+    A node listed in ``speculations`` may start before some of its
+    dependencies finish, on a fork of the session where each missing output is
+    stood in for by an output that is already available. When the real
+    outputs arrive and are close enough to the stand-ins, the speculative
+    result is kept; otherwise it is discarded and the node runs again.
+    """
+
+    dependencies: dict[str, list[str]] = Field(default_factory=dict)
+    """Maps a sub-agent name to the names of the sub-agents it waits for."""
+
+    speculations: dict[str, dict[str, str]] = Field(default_factory=dict)
+    """Maps a sub-agent name to {dependency: stand-in sub-agent}."""
+
+    speculation_threshold: float = 0.9
+    """Minimum similarity between a real output and its stand-in."""
+
+    @model_validator(mode="after")
+    def _check_dependencies(self) -> "ParallelDAGAgent":
+        names = {agent.name for agent in self.sub_agents}
+        for node, upstream in self.dependencies.items():
+            unknown = {node, *upstream} - names
+            if unknown:
+                raise ValueError(
+                    f"Invalid dependencies for agent {self.name}: "
+                    f"unknown sub-agents {sorted(unknown)}"
+                )
+        for node, stand_ins in self.speculations.items():
+            unknown = {*stand_ins.values()} - names
+            missing = set(stand_ins) - set(self.dependencies.get(node, ()))
+            if unknown or missing:
+                raise ValueError(
+                    f"Invalid speculations for agent {self.name}: {node} has "
+                    f"unknown stand-ins {sorted(unknown)} or non-dependencies "
+                    f"{sorted(missing)}"
+                )
+        self.topological_order()
+        return self
+
+    def topological_order(self) -> list[str]:
+        """
+        Resolve the order in which the sub-agents become runnable.
+
+        :return: The sub-agent names, each listed after all of its dependencies
+        :raises ValueError: If the dependency graph contains a cycle
+        """
+        waiting = {
+            agent.name: set(self.dependencies.get(agent.name, ()))
+            for agent in self.sub_agents
+        }
+        order: list[str] = []
+        while waiting:
+            ready = [
+                name for name, upstream in waiting.items() if upstream <= set(order)
+            ]
+            if not ready:
+                raise ValueError(
+                    f"Invalid dependencies for agent {self.name}: "
+                    f"cycle between {sorted(waiting)}"
+                )
+            for name in ready:
+                del waiting[name]
+            order.extend(ready)
+        return order
+
+    async def _speculate(
+        self, ctx: InvocationContext, agent: BaseAgent, guesses: dict[str, Any]
+    ) -> list[Event]:
+        session = fork_session(ctx.session)
+        session.state.update(guesses)
+        events = []
+        async for event in agent.run_async(ctx.model_copy(update={"session": session})):
+            # Only the final events are replayed if the speculation is kept.
+            if not event.partial:
+                apply_event(session, event)
+                events.append(event)
+        return events
+
+    def _guesses_hold(self, state: dict[str, Any], guesses: dict[str, Any]) -> bool:
+        return all(
+            similarity(str(state.get(key, "")), str(guess))
+            >= self.speculation_threshold
+            for key, guess in guesses.items()
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        agents = {agent.name: agent for agent in self.sub_agents}
+        waiting = {name: set(self.dependencies.get(name, ())) for name in agents}
+        finished: set[str] = set()
+        running: dict[str, asyncio.Task] = {}
+        speculating: dict[str, tuple[dict[str, Any], asyncio.Task]] = {}
+        # Every node pushes its events here and waits until the runner has
+        # processed them, so state written by a finished node is visible to the
+        # nodes it unblocks.
+        queue: asyncio.Queue[tuple[str, Event | BaseException | None, asyncio.Event]]
+        queue = asyncio.Queue()
+
+        async def run_node(name: str, events: AsyncIterator[Event]) -> None:
+            try:
+                async for event in events:
+                    processed = asyncio.Event()
+                    await queue.put((name, event, processed))
+                    # Partial (streamed) chunks are never persisted, so the
+                    # node keeps generating while the runner forwards them.
+                    if not event.partial:
+                        await processed.wait()
+            except Exception as e:
+                await queue.put((name, e, asyncio.Event()))
+            else:
+                await queue.put((name, None, asyncio.Event()))
+
+        async def replay(name: str, speculation: asyncio.Task) -> AsyncIterator[Event]:
+            try:
+                events = await speculation
+            except Exception as e:
+                logging.warning(f"{self.name} speculative run of {name} failed: {e}")
+                async for event in agents[name].run_async(ctx):
+                    yield event
+                return
+            for event in events:
+                yield event
+
+        def start_ready_nodes() -> None:
+            for name in [n for n, upstream in waiting.items() if upstream <= finished]:
+                del waiting[name]
+                guesses, speculation = speculating.pop(name, ({}, None))
+                if speculation is None:
+                    events = agents[name].run_async(ctx)
+                elif self._guesses_hold(ctx.session.state, guesses):
+                    logging.info(f"{self.name} kept speculative run of {name}")
+                    events = replay(name, speculation)
+                else:
+                    logging.info(f"{self.name} discarded speculative run of {name}")
+                    speculation.cancel()
+                    events = agents[name].run_async(ctx)
+                running[name] = asyncio.create_task(run_node(name, events))
+            for name, stand_ins in self.speculations.items():
+                if name not in waiting or name in speculating:
+                    continue
+                upstream = waiting[name] - set(stand_ins)
+                if upstream | set(stand_ins.values()) <= finished:
+                    guesses = {
+                        key: ctx.session.state.get(stand_in)
+                        for key, stand_in in stand_ins.items()
+                    }
+                    speculation = asyncio.create_task(
+                        self._speculate(ctx, agents[name], guesses)
+                    )
+                    speculating[name] = (guesses, speculation)
+
+        start_ready_nodes()
+        try:
+            while running:
+                name, item, processed = await queue.get()
+                if isinstance(item, BaseException):
+                    raise item
+                if item is None:
+                    del running[name]
+                    finished.add(name)
+                    start_ready_nodes()
+                    continue
+                yield item
+                if ctx.end_invocation:
+                    return
+                processed.set()
+        finally:
+            for _, task in speculating.values():
+                task.cancel()
+            for task in running.values():
+                task.cancel()
+
+
+@dataclass
+class _Sample:
+    session: Session
+    events: list[Event]
+    valid: bool
+
+
+class ParallelEarlyTerminationAgent(BaseAgent):
+    """
+    A workflow agent that runs its single sub-agent several times concurrently.
+
+    Every run works on its own fork of the session and buffers its events.
+    By default the first run that passes ``validator`` wins: its events are
+    replayed to the runner and the other runs are cancelled, so latency is the
+    fastest of ``n`` runs at roughly ``n`` times the token cost. With
+    ``aggregate`` set, all runs finish and the answer the runs agree on most
+    wins instead. Streaming output only reaches the client when ``n`` is 1,
+    since the other modes cannot emit anything before a run has been picked.
+    """
+
+    n: int = 3
+    """Number of concurrent runs."""
+
+    validator: Callable[[dict[str, Any]], bool] | None = None
+    """Accepts or rejects a run based on its final session state."""
+
+    aggregate: bool = False
+    """Wait for every run and vote instead of taking the first valid one."""
+
+    vote_key: str | None = None
+    """State key holding the answer compared when voting."""
+
+    @model_validator(mode="after")
+    def _check_sub_agents(self) -> "ParallelEarlyTerminationAgent":
+        if len(self.sub_agents) != 1:
+            raise ValueError(
+                f"Invalid config for agent {self.name}: exactly one sub-agent "
+                "is required"
+            )
+        if self.n < 1:
+            raise ValueError(f"Invalid config for agent {self.name}: n must be >= 1")
+        return self
+
+    async def _run_sample(self, ctx: InvocationContext, index: int) -> _Sample:
+        session = fork_session(ctx.session)
+        # Keeps caches from sharing responses between samples.
+        scope = session.state.get(CACHE_SCOPE_KEY, "")
+        session.state[CACHE_SCOPE_KEY] = f"{scope}/{self.name}:{index}"
+        sample_ctx = ctx.model_copy(update={"session": session})
+        events = []
+        async for event in self.sub_agents[0].run_async(sample_ctx):
+            # Streamed chunks are stale by the time a winner is replayed; the
+            # final event of each response carries the full text.
+            if not event.partial:
+                apply_event(session, event)
+                events.append(event)
+        valid = self.validator is None or self.validator(session.state)
+        return _Sample(session=session, events=events, valid=valid)
+
+    def _vote(self, samples: list[_Sample]) -> _Sample:
+        candidates = [sample for sample in samples if sample.valid] or samples
+        if not self.vote_key or len(candidates) < 3:
+            return candidates[0]
+        answers = [str(s.session.state.get(self.vote_key, "")) for s in candidates]
+        # Pick the answer closest to all the others (the medoid).
+        agreement = [
+            sum(similarity(answer, other) for other in answers if other is not answer)
+            for answer in answers
+        ]
+        return candidates[agreement.index(max(agreement))]
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        if self.n == 1:
+            async for event in self.sub_agents[0].run_async(ctx):
+                yield event
+            return
+
+        pending = {
+            asyncio.create_task(self._run_sample(ctx, index)) for index in range(self.n)
+        }
+        finished: list[_Sample] = []
+        errors: list[BaseException] = []
+        winner: _Sample | None = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        logging.warning(f"{self.name} run failed: {task.exception()}")
+                        errors.append(task.exception())
+                        continue
+                    sample = task.result()
+                    if sample.valid and not self.aggregate:
+                        winner = sample
+                        break
+                    finished.append(sample)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if winner is None:
+            if not finished:
+                raise errors[-1]
+            winner = self._vote(finished)
+        for event in winner.events:
+            yield event
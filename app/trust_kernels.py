@@ -0,0 +1,81 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Numeric kernels for comparing agent outputs.
+
+The kernels are compiled with Numba when it is installed (cached on disk so
+the compile cost is paid once) and fall back to NumPy otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def token_ids(text: str) -> np.ndarray:
+    """Map a text to the sorted, unique hashes of its lowercase tokens."""
+    return np.unique(np.array([hash(t) for t in text.lower().split()], dtype=np.int64))
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def cosine(a: np.ndarray, b: np.ndarray) -> float:
+        """Cosine similarity of two vectors, 0.0 if either is all zeros."""
+        dot = 0.0
+        norm_a = 0.0
+        norm_b = 0.0
+        for i in range(a.shape[0]):
+            dot += a[i] * b[i]
+            norm_a += a[i] * a[i]
+            norm_b += b[i] * b[i]
+        if norm_a == 0.0 or norm_b == 0.0:
+            return 0.0
+        return dot / np.sqrt(norm_a * norm_b)
+
+    @njit(cache=True)
+    def token_jaccard(tokens_a: np.ndarray, tokens_b: np.ndarray) -> float:
+        """Jaccard overlap of two sorted arrays of unique token ids."""
+        if tokens_a.shape[0] == 0 and tokens_b.shape[0] == 0:
+            return 1.0
+        i = 0
+        j = 0
+        shared = 0
+        while i < tokens_a.shape[0] and j < tokens_b.shape[0]:
+            if tokens_a[i] == tokens_b[j]:
+                shared += 1
+                i += 1
+                j += 1
+            elif tokens_a[i] < tokens_b[j]:
+                i += 1
+            else:
+                j += 1
+        return shared / (tokens_a.shape[0] + tokens_b.shape[0] - shared)
+
+else:
+
+    def cosine(a: np.ndarray, b: np.ndarray) -> float:
+        """Cosine similarity of two vectors, 0.0 if either is all zeros."""
+        norms = float(np.linalg.norm(a) * np.linalg.norm(b))
+        return float(np.dot(a, b)) / norms if norms else 0.0
+
+    def token_jaccard(tokens_a: np.ndarray, tokens_b: np.ndarray) -> float:
+        """Jaccard overlap of two sorted arrays of unique token ids."""
+        if tokens_a.size == 0 and tokens_b.size == 0:
+            return 1.0
+        shared = np.intersect1d(tokens_a, tokens_b, assume_unique=True).size
+        return shared / (tokens_a.size + tokens_b.size - shared)
@@ -0,0 +1,119 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prompt compression for the text agents hand to each other."""
+
+import functools
+import logging
+import os
+import re
+from typing import Any
+
+import numpy as np
+
+COMPRESSION_MODEL = os.environ.get(
+    "PROMPT_COMPRESSION_MODEL",
+    "microsoft/llmlingua-2-bert-base-multilingual-cased-meetingbank",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def get_compressor() -> Any | None:
+    """Load the LLMLingua-2 prompt compressor once per process.
+
+    Returns:
+        The compressor, or None when llmlingua is not installed
+    """
+    try:
+        from llmlingua import PromptCompressor
+    except ImportError:
+        logging.info("llmlingua not installed, prompt compression is disabled")
+        return None
+    return PromptCompressor(
+        model_name=COMPRESSION_MODEL, use_llmlingua2=True, device_map="cpu"
+    )
+
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Markdown headings, list items and bold labels carry the structure agents rely
+# on (e.g. the role names the role identifier lists), so they are never dropped.
+_STRUCTURAL_LINE = re.compile(r"(?:#{1,6}\s|[-*+\u2022]\s|\d+[.)]\s|\*\*)")
+
+
+def extractive_summary(text: str, ratio: float = 0.3) -> str:
+    """Keep the most informative sentences of a text, without calling a model.
+
+    Headings and list items are always kept. The remaining prose sentences
+    are scored by the sum of their TF-IDF weights and the top ones are kept,
+    everything in its original order.
+
+    Args:
+        text: The text to summarize
+        ratio: Fraction of prose sentences to keep
+
+    Returns:
+        The kept lines and sentences, one per line, or the original text when
+        there is nothing to drop
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    units: list[tuple[str, bool]] = []  # (text, always kept)
+    for line in map(str.strip, text.splitlines()):
+        if _STRUCTURAL_LINE.match(line):
+            units.append((line, True))
+        elif line:
+            units.extend((s, False) for s in _SENTENCE_BOUNDARY.split(line) if s)
+    prose = [i for i, (_, structural) in enumerate(units) if not structural]
+    keep = max(1, round(len(prose) * ratio))
+    if keep >= len(prose):
+        return text
+    try:
+        weights = TfidfVectorizer(stop_words="english").fit_transform(
+            [units[i][0] for i in prose]
+        )
+    except ValueError:  # Only stop words, nothing to score.
+        return text
+    scores = np.asarray(weights.sum(axis=1)).ravel()
+    kept = {prose[i] for i in np.argsort(scores)[-keep:]}
+    return "\n".join(
+        unit for i, (unit, structural) in enumerate(units) if structural or i in kept
+    )
+
+
+def compress_prompt(
+    text: str, ratio: float = 0.3, min_tokens: int = 500, extractive: bool = False
+) -> str:
+    """Compress text handed from one agent to the next.
+
+    Args:
+        text: The text to compress
+        ratio: Fraction of tokens to keep
+        min_tokens: Texts shorter than this are returned unchanged, since the
+            compression overhead would outweigh the savings
+        extractive: Without LLMLingua, shorten the text with the lossier
+            extractive_summary instead of returning it unchanged
+
+    Returns:
+        The compressed text, or the original text when it is short or no
+        compressor is available
+    """
+    # Roughly four characters per token for English text.
+    if len(text) // 4 < min_tokens:
+        return text
+    compressor = get_compressor()
+    if compressor is None:
+        return extractive_summary(text, ratio) if extractive else text
+    result = compressor.compress_prompt(text, rate=ratio, force_tokens=["\n"])
+    return result["compressed_prompt"]
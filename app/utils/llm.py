@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Gemini model wrapper that keeps one HTTP connection pool per event loop."""
+
+import asyncio
+import importlib.util
+from weakref import WeakKeyDictionary
+
+import httpx
+from google.adk.models import Gemini
+from google.genai import Client, types
+from pydantic import PrivateAttr
+
+# HTTP/2 multiplexes concurrent requests over one connection, but httpx only
+# supports it when the optional h2 package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+CONNECTION_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+
+class SharedClientGemini(Gemini):
+    """
+    A Gemini model whose API client is reused by every agent the instance is
+    assigned to, for as long as they run on the same event loop.
+
+    ADK builds a new Gemini model, and with it a new API client and connection
+    pool, every time an agent configured with a model name calls the model.
+    Sharing one instance keeps TLS connections warm across agents and calls.
+    Pooled connections are bound to the loop that opened them, and ADK's
+    synchronous Runner.run starts a fresh loop per call, so each loop gets its
+    own client.
+    """
+
+    # Each loop's client, and the task that closes it when the loop shuts down.
+    _clients: WeakKeyDictionary = PrivateAttr(default_factory=WeakKeyDictionary)
+
+    @property
+    def api_client(self) -> Client:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside a loop the client is only read for its configuration.
+            return self._new_client()
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = self._new_client()
+            entry = self._clients[loop] = (
+                client,
+                loop.create_task(self._close(client)),
+            )
+        return entry[0]
+
+    async def _close(self, client: Client) -> None:
+        """Close a client's connections while its loop shuts down.
+
+        asyncio.run cancels pending tasks before closing the loop, which is the
+        last point where the pooled connections can still be closed cleanly.
+        """
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await client.aio.aclose()
+            self._clients.pop(asyncio.get_running_loop(), None)
+
+    def _new_client(self) -> Client:
+        # google-genai switches to aiohttp whenever it is installed (litellm
+        # pulls it in) unless an httpx transport is passed; the transport also
+        # carries the pool settings, which httpx ignores next to a transport.
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE, limits=CONNECTION_LIMITS
+        )
+        return Client(
+            http_options=types.HttpOptions(
+                headers=self._tracking_headers,
+                async_client_args={"transport": transport},
+            )
+        )
@@ -0,0 +1,84 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Single-pass pattern matching over agent output, using Hyperscan when installed."""
+
+import re
+import threading
+from typing import Any
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+class PatternScanner:
+    """
+    Matches a fixed set of case-insensitive patterns against agent output.
+
+    With Hyperscan installed all patterns are compiled into one database and
+    the text is scanned once, regardless of how many patterns there are.
+    Otherwise each pattern is searched with a precompiled regex.
+    """
+
+    def __init__(self, patterns: dict[str, str]) -> None:
+        """
+        Compile the patterns.
+
+        :param patterns: Maps a signal name to its regular expression
+        """
+        self.names = list(patterns)
+        self._lock = threading.Lock()
+        self._database: Any = None
+        self._regexes: list[re.Pattern[str]] = []
+        if hyperscan is not None:
+            self._database = hyperscan.Database()
+            self._database.compile(
+                expressions=[pattern.encode() for pattern in patterns.values()],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH]
+                * len(patterns),
+            )
+        else:
+            self._regexes = [
+                re.compile(pattern, re.IGNORECASE) for pattern in patterns.values()
+            ]
+
+    def scan(self, text: str) -> set[str]:
+        """
+        Find which patterns occur in the text.
+
+        :param text: The text to scan
+        :return: Names of the patterns that matched
+        """
+        if self._database is None:
+            return {
+                name
+                for name, regex in zip(self.names, self._regexes, strict=True)
+                if regex.search(text)
+            }
+
+        matched: set[str] = set()
+
+        def on_match(
+            pattern_id: int, start: int, end: int, flags: int, context: Any
+        ) -> None:
+            matched.add(self.names[pattern_id])
+
+        # A database shares one scratch space, which can't be used concurrently.
+        with self._lock:
+            self._database.scan(text.encode(), match_event_handler=on_match)
+        return matched
@@ -3,12 +3,130 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import io
 import json
+from collections import Counter
 from datetime import datetime
+from dateutil import tz
 import numpy as np
-from typing import Dict, List, Any
+from typing import BinaryIO, Dict, Iterator, List, Any, NamedTuple, Optional
 import re
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser accepts bytes too
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+# Uploads above this size are stream-parsed (when ijson is installed) so only
+# the events array is materialized, not the rest of the session document
+STREAMING_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+def _stream_events(source: BinaryIO) -> Dict[str, Any]:
+    """Parse just the 'events' array of a session document"""
+    return {'events': list(ijson.items(source, 'events.item', use_float=True))}
+
+# Domain keywords per source category, in priority order
+SOURCE_CATEGORY_PATTERNS = {
+    'Academic/Research': re.compile(r'edu|org|ac\.'),
+    'Commercial': re.compile(r'com'),
+    'Technology': re.compile(r'io|ai|tech'),
+    'News/Media': re.compile(r'news|medium|forbes')
+}
+
+# Color mapping for different agents
+AGENT_COLORS = {
+    'user': '#ff7f0e',
+    'data_collector_agent': '#2ca02c',
+    'role_identifier_agent': '#d62728',
+    'prompt_generator_agent': '#9467bd',
+    'role_thought_collector_agent': '#8c564b',
+    'fact_checker_agent': '#e377c2',
+    'conflict_resolution_agent': '#7f7f7f',
+    'simulation_agent': '#bcbd22',
+    'scoring_agent': '#17becf',
+    'final_solution_agent': '#1f77b4',
+    'visualization_agent': '#ff9896'
+}
+DEFAULT_AGENT_COLOR = '#333333'
+
+# AGENT_COLORS as an index and color array, so colors come from positions;
+# position -1 (an unknown author) picks the trailing default color
+AUTHOR_CATS = pd.Index(list(AGENT_COLORS))
+COLOR_ARR = np.array(list(AGENT_COLORS.values()) + [DEFAULT_AGENT_COLOR])
+
+# Summary columns derived for rendering; left out of the table and CSV export
+PRESENTATION_COLUMNS = ['Author_Pretty', 'Author_Color']
+
+# Escapes HTML brackets and turns newlines into <br> in a single pass
+_HTML_TABLE = str.maketrans({'<': '&lt;', '>': '&gt;', '\n': '<br>'})
+
+# Shared stand-in for missing nested objects, so lookups don't allocate a dict
+_EMPTY: Dict[str, Any] = {}
+
+# The agent details tab shows this many grounding chunks per event
+GROUNDING_PREVIEW_SIZE = 5
+
+def _grounding_webs(grounding_metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Raw web entries of an event's grounding chunks"""
+    return [chunk['web'] for chunk in grounding_metadata.get('groundingChunks') or () if 'web' in chunk]
+
+def _extract_event(event: Dict[str, Any], eager: bool = True) -> Dict[str, Any]:
+    """
+    Flatten one raw session event into the dashboard's event dict.
+    Unless eager, only the first GROUNDING_PREVIEW_SIZE grounding chunks
+    are built, as 'grounding_chunks_preview'
+    """
+    get = event.get
+    content = get('content') or _EMPTY
+    grounding_metadata = get('groundingMetadata') or _EMPTY
+    
+    content_parts = [part['text'] for part in content.get('parts') or () if 'text' in part]
+    webs = _grounding_webs(grounding_metadata)
+    grounding_chunks = [
+        {'domain': web.get('domain'), 'title': web.get('title'), 'uri': web.get('uri')}
+        for web in (webs if eager else webs[:GROUNDING_PREVIEW_SIZE])
+    ]
+    grounding_supports = [
+        {
+            'grounding_chunk_indices': support.get('groundingChunkIndices', []),
+            'segment': support.get('segment', {})
+        }
+        for support in grounding_metadata.get('groundingSupports') or ()
+    ]
+    web_search_queries = grounding_metadata.get('webSearchQueries', [])
+    
+    return {
+        'id': get('id'),
+        'timestamp': get('timestamp'),
+        'author': get('author'),
+        'invocation_id': get('invocationId'),
+        'role': content.get('role'),
+        'content_parts': content_parts,
+        'grounding_chunks' if eager else 'grounding_chunks_preview': grounding_chunks,
+        'grounding_chunks_count': len(webs),
+        'grounding_supports': grounding_supports,
+        'search_queries': web_search_queries
+    }
+
+class EventBundle(NamedTuple):
+    """Everything the dashboard derives from a session's events"""
+    events: List[Dict[str, Any]]
+    summary: pd.DataFrame
+    sources: List[str]
+    source_usage: Counter
+
 class Event_Extractor:
     """
     Embedded extractor class for the dashboard
@@ -16,91 +134,114 @@ class Event_Extractor:
     
     def __init__(self, json_file_path: str = None, json_data: dict = None):
         if json_file_path:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            with open(json_file_path, 'rb') as f:
+                self.data = _stream_events(f) if ijson else _loads(f.read())
         elif json_data:
             self.data = json_data
         else:
             raise ValueError("Either json_file_path or json_data must be provided")
-    
-    def extract_all_events(self) -> List[Dict[str, Any]]:
+        # Filled on first use; the dashboard reads it many times
+        self._bundle: Optional[EventBundle] = None
+    
+    def extract_bundle(self) -> EventBundle:
+        """Extract preview events, the summary table and source usage"""
+        if self._bundle is not None:
+            return self._bundle
+        raw_events = self.data.get('events', [])
+        n = len(raw_events)
         events = []
-        for event in self.data.get('events', []):
-            event_info = {
-                'id': event.get('id'),
-                'timestamp': event.get('timestamp'),
-                'author': event.get('author'),
-                'invocation_id': event.get('invocationId'),
-                'role': event.get('content', {}).get('role'),
-                'content_parts': [],
-                'grounding_chunks': [],
-                'grounding_supports': [],
-                'search_queries': []
-            }
-            
-            # Extract content parts
-            content = event.get('content', {})
-            parts = content.get('parts', [])
-            for part in parts:
-                if 'text' in part:
-                    event_info['content_parts'].append(part['text'])
-            
-            # Extract grounding metadata
-            grounding_metadata = event.get('groundingMetadata', {})
-            
-            # Extract grounding chunks
-            grounding_chunks = grounding_metadata.get('groundingChunks', [])
-            for chunk in grounding_chunks:
-                if 'web' in chunk:
-                    web_info = chunk['web']
-                    event_info['grounding_chunks'].append({
-                        'domain': web_info.get('domain'),
-                        'title': web_info.get('title'),
-                        'uri': web_info.get('uri')
-                    })
-            
-            # Extract grounding supports
-            grounding_supports = grounding_metadata.get('groundingSupports', [])
-            for support in grounding_supports:
-                support_info = {
-                    'grounding_chunk_indices': support.get('groundingChunkIndices', []),
-                    'segment': support.get('segment', {})
-                }
-                event_info['grounding_supports'].append(support_info)
-            
-            # Extract search queries
-            web_search_queries = grounding_metadata.get('webSearchQueries', [])
-            event_info['search_queries'] = web_search_queries
-            
+        ids, authors, roles = [None] * n, [None] * n, [None] * n
+        timestamps = np.empty(n, dtype=np.float64)
+        content_lengths = np.empty(n, dtype=np.int32)
+        chunk_counts = np.empty(n, dtype=np.int32)
+        support_counts = np.empty(n, dtype=np.int32)
+        query_counts = np.empty(n, dtype=np.int32)
+        for i, event in enumerate(raw_events):
+            event_info = _extract_event(event, eager=False)
             events.append(event_info)
+            
+            # Summary columns, while the event is at hand
+            ids[i] = event_info['id']
+            authors[i] = event_info['author']
+            roles[i] = event_info['role']
+            timestamp = event_info['timestamp']
+            timestamps[i] = np.nan if timestamp is None else timestamp
+            content_lengths[i] = sum(map(len, event_info['content_parts']))
+            chunk_counts[i] = event_info['grounding_chunks_count']
+            support_counts[i] = len(event_info['grounding_supports'])
+            query_counts[i] = len(event_info['search_queries'])
         
-        return events
+        summary = pd.DataFrame({
+            'ID': ids,
+            'Author': authors,
+            'Role': roles,
+            'Timestamp': timestamps,
+            'Content_Length': content_lengths,
+            'Grounding_Chunks_Count': chunk_counts,
+            'Grounding_Supports_Count': support_counts,
+            'Search_Queries_Count': query_counts
+        }).convert_dtypes(dtype_backend='pyarrow')  # Arrow compute for sums and filters
+        # Display name and color per event, shared by every chart and the details tab
+        summary['Author_Pretty'] = summary['Author'].str.replace('_', ' ', regex=False).str.title()
+        summary['Author_Color'] = COLOR_ARR[AUTHOR_CATS.get_indexer(summary['Author'])]
+        source_usage = Counter(self.iter_all_domains())
+        self._bundle = EventBundle(events, summary, sorted(source_usage), source_usage)
+        return self._bundle
+    
+    def iter_all_domains(self) -> Iterator[str]:
+        """Yield the domain of every grounding chunk, without building chunk dicts"""
+        for event in self.data.get('events', []):
+            for web in _grounding_webs(event.get('groundingMetadata') or _EMPTY):
+                domain = web.get('domain')
+                if domain:
+                    yield domain
+    
+    def extract_first_event(self) -> Optional[Dict[str, Any]]:
+        """Extract only the first event, without building the whole bundle"""
+        raw_events = self.data.get('events', [])
+        return _extract_event(raw_events[0]) if raw_events else None
+    
+    def extract_all_events(self, eager: bool = False) -> List[Dict[str, Any]]:
+        """Events with a grounding preview, or every grounding chunk if eager"""
+        if eager:
+            return [_extract_event(event) for event in self.data.get('events', [])]
+        return self.extract_bundle().events
     
     def get_event_summary(self) -> pd.DataFrame:
-        events = self.extract_all_events()
-        summary_data = []
-        for event in events:
-            summary_data.append({
-                'ID': event['id'],
-                'Author': event['author'],
-                'Role': event['role'],
-                'Timestamp': event['timestamp'],
-                'Content_Length': len(''.join(event['content_parts'])),
-                'Grounding_Chunks_Count': len(event['grounding_chunks']),
-                'Grounding_Supports_Count': len(event['grounding_supports']),
-                'Search_Queries_Count': len(event['search_queries'])
-            })
-        
-        return pd.DataFrame(summary_data)
+        return self.extract_bundle().summary
     
     def get_grounding_sources(self) -> List[str]:
-        all_events = self.extract_all_events()
-        domains = set()
-        for event in all_events:
-            for chunk in event['grounding_chunks']:
-                if chunk['domain']:
-                    domains.add(chunk['domain'])
-        return sorted(list(domains))
+        return self.extract_bundle().sources
+
+def format_timestamps(seconds: pd.Series) -> pd.Series:
+    """Format epoch seconds as local date-times in one vectorized pass"""
+    # tzlocal() applies each timestamp's own DST offset, as datetime.fromtimestamp does
+    local_tz = tz.tzlocal()
+    times = pd.to_datetime(seconds.astype('float64'), unit='s', utc=True)
+    return times.dt.tz_convert(local_tz).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+def summary_to_csv(summary_df: pd.DataFrame) -> bytes:
+    """Encode the summary as CSV, with Arrow's multithreaded writer when available
+
+    Arrow's dialect differs from to_csv: the header and every string field are
+    quoted and integral floats lose their '.0'. Both parse back to the same frame.
+    """
+    if pa is None:
+        return summary_df.to_csv(index=False).encode()
+    buffer = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(summary_df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_extractor(file_bytes: bytes) -> Event_Extractor:
+    """Parse an uploaded session once; Streamlit reruns reuse the result"""
+    if ijson and len(file_bytes) > STREAMING_THRESHOLD_BYTES:
+        data = _stream_events(io.BytesIO(file_bytes))
+    else:
+        data = _loads(file_bytes)
+    extractor = Event_Extractor(json_data=data)
+    extractor.extract_bundle()
+    return extractor
 
 def setup_page_config():
     """Configure Streamlit page settings"""
@@ -152,6 +293,20 @@ def load_custom_css():
         font-size: 0.8rem;
     }
     
+    .source-card {
+        background: #e3f2fd;
+        padding: 0.5rem;
+        margin: 0.3rem 0;
+        border-radius: 8px;
+        border-left: 4px solid #1976d2;
+        font-size: 12px;
+    }
+    
+    .query-card {
+        background: #fff3e0;
+        border-left-color: #f57c00;
+    }
+    
     .timeline-item {
         border-left: 3px solid #1f77b4;
         padding-left: 1rem;
@@ -196,48 +351,43 @@ def create_metrics_overview(summary_df):
             delta=f"{len(summary_df[summary_df['Search_Queries_Count'] > 0])} events with searches"
         )
 
+def _hash_frame(df: pd.DataFrame) -> bytes:
+    return pd.util.hash_pandas_object(df, index=True).values.tobytes()
+
+# Figures are rebuilt only when their data changes, not on every widget rerun
+_cache_figure = st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_frame})
+
+@_cache_figure
 def create_agent_workflow_chart(summary_df):
     """Create agent workflow visualization"""
     fig = go.Figure()
     
     # Create timeline
-    timestamps = summary_df['Timestamp'].values
+    timestamps = summary_df['Timestamp'].to_numpy(dtype=np.float64, na_value=np.nan)
     authors = summary_df['Author'].values
     
-    # Normalize timestamps for better visualization
-    min_ts = min(timestamps)
-    normalized_ts = [(ts - min_ts) for ts in timestamps]
-    
-    # Color mapping for different agents
-    color_map = {
-        'user': '#ff7f0e',
-        'data_collector_agent': '#2ca02c',
-        'role_identifier_agent': '#d62728',
-        'prompt_generator_agent': '#9467bd',
-        'role_thought_collector_agent': '#8c564b',
-        'fact_checker_agent': '#e377c2',
-        'conflict_resolution_agent': '#7f7f7f',
-        'simulation_agent': '#bcbd22',
-        'scoring_agent': '#17becf',
-        'final_solution_agent': '#1f77b4',
-        'visualization_agent': '#ff9896'
-    }
-    
-    for i, (author, ts) in enumerate(zip(authors, normalized_ts)):
-        fig.add_trace(go.Scatter(
-            x=[ts], 
-            y=[i],
-            mode='markers+text',
-            marker=dict(
-                size=15,
-                color=color_map.get(author, '#333333'),
-                line=dict(width=2, color='white')
-            ),
-            text=[author.replace('_', ' ').title()],
-            textposition="middle right",
-            name=author.replace('_', ' ').title(),
-            showlegend=False
-        ))
+    # Normalize timestamps for better visualization; events without one stay NaN
+    normalized_ts = timestamps - np.nanmin(timestamps)
+    
+    colors = summary_df['Author_Color'].tolist()
+    labels = summary_df['Author_Pretty'].tolist()
+    
+    # One trace for all events; per-point colors and labels are arrays
+    fig.add_trace(go.Scatter(
+        x=normalized_ts,
+        y=list(range(len(authors))),
+        mode='markers+text',
+        marker=dict(
+            size=15,
+            color=colors,
+            line=dict(width=2, color='white')
+        ),
+        text=labels,
+        textposition="middle right",
+        # Per-event traces used to show the agent as the trace name on hover
+        hovertemplate="%{text}<br>+%{x:.1f}s<extra></extra>",
+        showlegend=False
+    ))
     
     fig.update_layout(
         title="Agent Workflow Timeline",
@@ -250,6 +400,7 @@ def create_agent_workflow_chart(summary_df):
     
     return fig
 
+@_cache_figure
 def create_content_analysis_chart(summary_df):
     """Create content analysis visualization"""
     fig = make_subplots(
@@ -262,13 +413,10 @@ def create_content_analysis_chart(summary_df):
         horizontal_spacing=0.1
     )
     
-    # Clean author names for better display
-    clean_authors = [author.replace('_', ' ').title() for author in summary_df['Author']]
-    
     # Content length by agent
     fig.add_trace(
         go.Bar(
-            x=clean_authors,
+            x=summary_df['Author_Pretty'],
             y=summary_df['Content_Length'],
             name="Content Length",
             marker_color='lightblue',
@@ -281,10 +429,9 @@ def create_content_analysis_chart(summary_df):
     # Grounding sources pie chart
     sources_data = summary_df[summary_df['Grounding_Chunks_Count'] > 0]
     if not sources_data.empty:
-        clean_source_authors = [author.replace('_', ' ').title() for author in sources_data['Author']]
         fig.add_trace(
             go.Pie(
-                labels=clean_source_authors,
+                labels=sources_data['Author_Pretty'],
                 values=sources_data['Grounding_Chunks_Count'],
                 name="Grounding Sources",
                 textinfo='label+value'
@@ -295,10 +442,9 @@ def create_content_analysis_chart(summary_df):
     # Search queries by agent
     queries_data = summary_df[summary_df['Search_Queries_Count'] > 0]
     if not queries_data.empty:
-        clean_query_authors = [author.replace('_', ' ').title() for author in queries_data['Author']]
         fig.add_trace(
             go.Bar(
-                x=clean_query_authors,
+                x=queries_data['Author_Pretty'],
                 y=queries_data['Search_Queries_Count'],
                 name="Search Queries",
                 marker_color='lightcoral',
@@ -311,7 +457,7 @@ def create_content_analysis_chart(summary_df):
     # Event processing flow
     fig.add_trace(
         go.Scatter(
-            x=clean_authors,
+            x=summary_df['Author_Pretty'],
             y=summary_df['Content_Length'],
             mode='lines+markers',
             name="Content Flow",
@@ -341,11 +487,11 @@ def create_content_analysis_chart(summary_df):
 def display_agent_details(extractor):
     """Display detailed information about each agent"""
     events = extractor.extract_all_events()
+    agent_names = extractor.get_event_summary()['Author_Pretty']
     
     st.subheader("🤖 Agent Contributions Analysis")
     
-    for i, event in enumerate(events):
-        agent_name = event['author'].replace('_', ' ').title()
+    for i, (event, agent_name) in enumerate(zip(events, agent_names)):
         with st.expander(f"Agent {i+1}: {agent_name}", expanded=False):
             
             # Agent metadata
@@ -364,7 +510,7 @@ def display_agent_details(extractor):
                 with met_col1:
                     st.metric("Content", f"{len(''.join(event['content_parts'])):,}")
                 with met_col2:
-                    st.metric("Sources", len(event['grounding_chunks']))
+                    st.metric("Sources", event['grounding_chunks_count'])
                 with met_col3:
                     st.metric("Queries", len(event['search_queries']))
             
@@ -374,12 +520,7 @@ def display_agent_details(extractor):
             if event['content_parts']:
                 st.markdown("### 📄 **Full Content Output**")
                 full_content = '\n\n'.join(event['content_parts'])
-                formatted_content = (
-                full_content
-                .replace('<', '&lt;')   # escape HTML brackets properly
-                .replace('>', '&gt;')
-                .replace("\n", "<br>")  # replace actual newlines with <br>
-                )
+                formatted_content = full_content.translate(_HTML_TABLE)
                 
                 # Enhanced content display with better styling
                 st.markdown(f"""
@@ -412,79 +553,68 @@ def display_agent_details(extractor):
                         st.info("Content displayed above in scrollable format")
             
             # Additional details in columns
-            if event['grounding_chunks'] or event['search_queries']:
+            if event['grounding_chunks_count'] or event['search_queries']:
                 st.markdown("### 🔗 **Research Sources & Queries**")
                 detail_col1, detail_col2 = st.columns(2)
                 
                 with detail_col1:
-                    if event['grounding_chunks']:
+                    if event['grounding_chunks_count']:
                         st.markdown("**📚 Grounding Sources:**")
-                        for idx, chunk in enumerate(event['grounding_chunks'][:5]):
-                            st.markdown(f"""
-                            <div style="
-                                background: #e3f2fd; 
-                                padding: 0.5rem; 
-                                margin: 0.3rem 0; 
-                                border-radius: 8px;
-                                border-left: 4px solid #1976d2;
-                                font-size: 12px;
-                            ">
-                                <strong>{chunk['domain']}</strong><br>
-                                <small>{chunk['title'][:50]}...</small>
-                            </div>
-                            """, unsafe_allow_html=True)
+                        st.markdown(''.join(
+                            f'<div class="source-card"><strong>{chunk["domain"]}</strong><br>'
+                            f'<small>{chunk["title"][:50]}...</small></div>'
+                            for chunk in event['grounding_chunks_preview']
+                        ), unsafe_allow_html=True)
                         
-                        if len(event['grounding_chunks']) > 5:
-                            st.caption(f"... and {len(event['grounding_chunks']) - 5} more sources")
+                        hidden = event['grounding_chunks_count'] - GROUNDING_PREVIEW_SIZE
+                        if hidden > 0:
+                            st.caption(f"... and {hidden} more sources")
                 
                 with detail_col2:
                     if event['search_queries']:
                         st.markdown("**🔍 Search Queries Used:**")
-                        for idx, query in enumerate(event['search_queries']):
-                            st.markdown(f"""
-                            <div style="
-                                background: #fff3e0; 
-                                padding: 0.5rem; 
-                                margin: 0.3rem 0; 
-                                border-radius: 8px;
-                                border-left: 4px solid #f57c00;
-                                font-size: 12px;
-                            ">
-                                <strong>Query {idx+1}:</strong> {query}
-                            </div>
-                            """, unsafe_allow_html=True)
+                        st.markdown(''.join(
+                            f'<div class="source-card query-card"><strong>Query {idx+1}:</strong> {query}</div>'
+                            for idx, query in enumerate(event['search_queries'])
+                        ), unsafe_allow_html=True)
+
+@_cache_figure
+def create_source_usage_chart(source_df):
+    """Create the top referenced sources bar chart"""
+    fig = px.bar(
+        source_df, 
+        x='Usage_Count', 
+        y='Source', 
+        orientation='h',
+        title="Top 15 Most Referenced Sources",
+        color='Usage_Count',
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+@_cache_figure
+def create_source_category_chart(source_categories):
+    """Create the source category pie chart"""
+    return px.pie(
+        values=list(source_categories.values()),
+        names=list(source_categories.keys()),
+        title="Source Categories"
+    )
 
 def display_source_analysis(extractor):
     """Display source analysis"""
     st.subheader("📚 Source Analysis")
     
-    sources = extractor.get_grounding_sources()
-    events = extractor.extract_all_events()
-    
-    # Count source usage
-    source_usage = {}
-    for event in events:
-        for chunk in event['grounding_chunks']:
-            domain = chunk['domain']
-            if domain:
-                source_usage[domain] = source_usage.get(domain, 0) + 1
+    bundle = extractor.extract_bundle()
+    sources = bundle.sources
+    source_usage = bundle.source_usage
     
     if source_usage:
         # Create source usage chart
-        source_df = pd.DataFrame(list(source_usage.items()), columns=['Source', 'Usage_Count'])
-        source_df = source_df.sort_values('Usage_Count', ascending=False).head(15)
+        source_df = pd.DataFrame(source_usage.most_common(15), columns=['Source', 'Usage_Count'])
         
-        fig = px.bar(
-            source_df, 
-            x='Usage_Count', 
-            y='Source', 
-            orientation='h',
-            title="Top 15 Most Referenced Sources",
-            color='Usage_Count',
-            color_continuous_scale='Blues'
-        )
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(create_source_usage_chart(source_df), use_container_width=True)
         
         # Source categories
         col1, col2 = st.columns(2)
@@ -492,34 +622,16 @@ def display_source_analysis(extractor):
             st.markdown("**📈 Source Statistics:**")
             st.write(f"• Total unique sources: **{len(sources)}**")
             st.write(f"• Most referenced: **{source_df.iloc[0]['Source']}** ({source_df.iloc[0]['Usage_Count']} times)")
-            st.write(f"• Average references per source: **{sum(source_usage.values()) / len(source_usage):.1f}**")
+            st.write(f"• Average references per source: **{source_usage.total() / len(source_usage):.1f}**")
         
         with col2:
-            # Categorize sources
-            categories = {
-                'Academic/Research': ['edu', 'org', 'ac.'],
-                'Commercial': ['com'],
-                'Technology': ['io', 'ai', 'tech'],
-                'News/Media': ['news', 'medium', 'forbes']
-            }
-            
-            source_categories = {'Other': 0}
-            for source in sources:
-                categorized = False
-                for category, keywords in categories.items():
-                    if any(keyword in source.lower() for keyword in keywords):
-                        source_categories[category] = source_categories.get(category, 0) + 1
-                        categorized = True
-                        break
-                if not categorized:
-                    source_categories['Other'] += 1
+            # Categorize sources; the first matching category wins
+            lowered = pd.Series(sources, dtype=object).str.lower()
+            masks = [lowered.str.contains(pattern) for pattern in SOURCE_CATEGORY_PATTERNS.values()]
+            labels = np.select(masks, list(SOURCE_CATEGORY_PATTERNS), default='Other')
+            source_categories = {'Other': 0, **Counter(labels.tolist())}
             
-            fig_pie = px.pie(
-                values=list(source_categories.values()),
-                names=list(source_categories.keys()),
-                title="Source Categories"
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            st.plotly_chart(create_source_category_chart(source_categories), use_container_width=True)
 
 def main():
     """Main dashboard function"""
@@ -540,8 +652,7 @@ def main():
     if uploaded_file is not None:
         try:
             # Load data
-            json_data = json.load(uploaded_file)
-            extractor = Event_Extractor(json_data=json_data)
+            extractor = load_extractor(uploaded_file.getvalue())
             summary_df = extractor.get_event_summary()
             
             # Success message
@@ -576,16 +687,20 @@ def main():
             
             with tab3:
                 st.subheader("Event Summary Table")
+                summary_df = summary_df.drop(columns=PRESENTATION_COLUMNS)
+                # Formatted once up front; a Styler would format every cell on each render.
+                # Content_Length stays numeric so the column still sorts by value
+                display_df = summary_df.assign(
+                    Timestamp=format_timestamps(summary_df['Timestamp'])
+                )
                 st.dataframe(
-                    summary_df.style.format({
-                        'Content_Length': '{:,}',
-                        'Timestamp': lambda x: datetime.fromtimestamp(x).strftime('%Y-%m-%d %H:%M:%S')
-                    }),
-                    use_container_width=True
+                    display_df,
+                    use_container_width=True,
+                    column_config={'Content_Length': st.column_config.NumberColumn(format='%,d')}
                 )
                 
                 # Download button
-                csv = summary_df.to_csv(index=False)
+                csv = summary_to_csv(summary_df)
                 st.download_button(
                     label="📥 Download Summary as CSV",
                     data=csv,
@@ -595,11 +710,10 @@ def main():
             
             with tab4:
                 st.subheader("Raw Event Data")
-                events = extractor.extract_all_events()
-                st.json(events[0] if events else {}, expanded=False)
+                st.json(extractor.extract_first_event() or {}, expanded=False)
                 
                 if st.button("🔄 Show All Raw Data"):
-                    st.json(events)
+                    st.json(extractor.extract_all_events(eager=True))
         
         except Exception as e:
             st.error(f"❌ Error processing file: {str(e)}")
@@ -0,0 +1,244 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import google_search
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from app import agent
+from app.agent import (
+    ROLE_SIGNALS,
+    ConflictReport,
+    RoleThoughts,
+    build_root_agent,
+    fact_check_passed,
+    make_role_analysis_tools,
+    pipeline_speculations,
+    resolve_conflicts,
+    route_role_tools,
+    validate_conflict_report,
+)
+from app.cache import get_response_cache
+from app.utils import compression
+
+
+@pytest.fixture
+def cloud_project(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Agents resolve the project when built; skip credential discovery."""
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+
+
+def test_resolve_conflicts_reports_flagged_thoughts() -> None:
+    """Thoughts that mention a contradiction are listed, the rest are not."""
+    thoughts = RoleThoughts(
+        thoughts={
+            "Technical Expert": "A microservice rollout is feasible in 6 months.",
+            "Regulatory Advisor": "This contradicts the 12-month audit window.",
+        }
+    ).model_dump_json()
+
+    report = ConflictReport.model_validate_json(resolve_conflicts(thoughts))
+
+    assert report.conflicts == [
+        "Regulatory Advisor: This contradicts the 12-month audit window."
+    ]
+    assert report.resolved_thoughts == thoughts
+
+
+def test_resolve_conflicts_accepts_plain_text() -> None:
+    thoughts = "Technical: cloud first.\nUX: no conflicts with the cloud plan."
+
+    report = ConflictReport.model_validate_json(resolve_conflicts(thoughts))
+
+    assert report.conflicts == []
+    assert report.resolved_thoughts == thoughts
+
+
+def test_compress_response_shrinks_final_text_only(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Final answers are compressed in place; tool calls and chunks are not."""
+    monkeypatch.setattr(agent, "compress_prompt", lambda text, **_: text[:5])
+    context = SimpleNamespace(agent_name="simulation_agent", state={})
+    final = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text="long answer")])
+    )
+    partial = LlmResponse(
+        partial=True,
+        content=types.Content(role="model", parts=[types.Part(text="long chunk")]),
+    )
+    call = LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(text="calling a tool"),
+                types.Part(function_call=types.FunctionCall(name="tool", args={})),
+            ],
+        )
+    )
+
+    for response in (final, partial, call):
+        assert agent.compress_response(context, response) is None
+
+    assert final.content.parts[0].text == "long "
+    assert partial.content.parts[0].text == "long chunk"
+    assert call.content.parts[0].text == "calling a tool"
+
+
+def test_compress_response_falls_back_to_an_extractive_summary(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without LLMLingua, prose is trimmed but list items survive."""
+    monkeypatch.setattr(compression, "get_compressor", lambda: None)
+    filler = "It was what it was. " * 20
+    text = "\n".join(
+        [f"{filler}Solar capacity in Spain grew forty percent."] * 10
+        + ["- Technical Expert: grid integration"]
+    )
+    response = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)])
+    )
+
+    agent.compress_response(SimpleNamespace(state={}), response)
+
+    compressed = response.content.parts[0].text
+    assert len(compressed) < len(text) / 2
+    assert "- Technical Expert: grid integration" in compressed
+
+
+@pytest.mark.parametrize(
+    ("fact_check", "passed"),
+    [
+        ("All critical claims verified.", True),
+        ("Not all critical claims verified: the 2023 figure is wrong.", False),
+        ("Not all critical claims were verified.", False),
+        ("Two claims could not be checked.", False),
+    ],
+)
+def test_fact_check_passed_rejects_negated_verification(
+    fact_check: str, passed: bool
+) -> None:
+    assert fact_check_passed({"fact_checker_agent": fact_check}) is passed
+
+
+@pytest.mark.usefixtures("cloud_project")
+def test_role_analysis_tools_are_search_grounded_agents() -> None:
+    """Every role tool runs its own agent with web search, named for routing."""
+    tools = make_role_analysis_tools()
+
+    assert [tool.name for tool in tools] == ROLE_SIGNALS.names
+    for tool in tools:
+        assert isinstance(tool, AgentTool)
+        assert tool.agent.tools == [google_search]
+        assert tool.agent.output_key is None
+        assert tool._get_declaration().parameters.required == ["request"]
+
+
+def role_tool_request() -> LlmRequest:
+    """A request declaring every role tool, as ADK builds it."""
+    request = LlmRequest(config=types.GenerateContentConfig(tools=[]))
+    request.append_tools(make_role_analysis_tools())
+    return request
+
+
+def declared_names(request: LlmRequest) -> set[str]:
+    return {
+        declaration.name
+        for tool in request.config.tools
+        for declaration in tool.function_declarations or ()
+    }
+
+
+@pytest.mark.usefixtures("cloud_project")
+def test_route_role_tools_keeps_only_identified_roles() -> None:
+    request = role_tool_request()
+    roles = "1. **Regulatory Advisor**: GDPR exposure\n2. **UX Consultant**: onboarding"
+    context = SimpleNamespace(state={"role_identifier_agent": roles})
+
+    route_role_tools(context, request)
+
+    expected = {"analyze_as_regulatory_advisor", "analyze_as_ux_consultant"}
+    assert declared_names(request) == expected
+    assert set(request.tools_dict) == expected
+
+
+@pytest.mark.usefixtures("cloud_project")
+def test_route_role_tools_keeps_everything_without_recognized_roles() -> None:
+    request = role_tool_request()
+    context = SimpleNamespace(state={"role_identifier_agent": "A historian"})
+
+    route_role_tools(context, request)
+
+    assert declared_names(request) == set(ROLE_SIGNALS.names)
+    assert set(request.tools_dict) == set(ROLE_SIGNALS.names)
+
+
+@pytest.mark.parametrize(
+    ("speculate", "embedder", "enabled"),
+    [("false", object(), False), ("true", None, False), ("true", object(), True)],
+)
+def test_speculation_needs_opt_in_and_an_embedder(
+    monkeypatch: pytest.MonkeyPatch, speculate: str, embedder: object, enabled: bool
+) -> None:
+    monkeypatch.setenv("SOLVER_SPECULATE", speculate)
+    monkeypatch.setattr(agent, "get_embedder", lambda: embedder)
+
+    assert bool(pipeline_speculations()) is enabled
+
+
+@pytest.mark.usefixtures("cloud_project")
+def test_route_role_tools_input_is_never_compressed() -> None:
+    """Role names must reach route_role_tools exactly as the model wrote them."""
+    pipeline = build_root_agent().sub_agents[0]
+    role_identifier = pipeline.find_sub_agent("role_identifier_agent")
+
+    assert agent.compress_response not in (role_identifier.after_model_callback or [])
+
+
+@pytest.mark.usefixtures("cloud_project")
+def test_every_agent_goes_through_the_response_cache() -> None:
+    """The cache stores a reply only after the agent's own callbacks ran."""
+    cache = get_response_cache()
+    pipeline = build_root_agent().sub_agents[0]
+
+    for sub_agent in pipeline.sub_agents:
+        assert cache.before_model in sub_agent.before_model_callback
+        assert sub_agent.after_model_callback[-1] == cache.after_model
+    resolver = pipeline.find_sub_agent("conflict_resolution_agent")
+    assert resolver.after_model_callback == [
+        validate_conflict_report,
+        cache.after_model,
+    ]
+
+
+def test_validate_conflict_report_keeps_valid_and_rebuilds_invalid_replies() -> None:
+    thoughts = "Technical: cloud first.\nLegal: this contradicts data residency."
+    context = SimpleNamespace(state={"role_thought_collector_agent": thoughts})
+    valid = ConflictReport(resolved_thoughts="All aligned").model_dump_json()
+
+    def reply(text: str) -> LlmResponse:
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)])
+        )
+
+    assert validate_conflict_report(context, reply(valid)) is None
+    rebuilt = validate_conflict_report(context, reply("Here is the report: ..."))
+
+    report = ConflictReport.model_validate_json(rebuilt.content.parts[0].text)
+    assert report.conflicts == ["Legal: this contradicts data residency."]
+    assert report.resolved_thoughts == thoughts
@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.cache import CACHE_SCOPE_KEY, SemanticCache
+
+
+def bag_of_words(texts: list[str]) -> np.ndarray:
+    """Tiny deterministic embedder: normalized counts over a fixed vocabulary."""
+    vocab = ["solar", "wind", "energy", "policy", "storage", "water"]
+    vectors = np.array(
+        [[text.lower().split().count(word) for word in vocab] for text in texts],
+        dtype=np.float32,
+    )
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1)
+
+
+def test_exact_hit_skips_embedding() -> None:
+    calls: list[list[str]] = []
+
+    def embedder(texts: list[str]) -> np.ndarray:
+        calls.append(texts)
+        return bag_of_words(texts)
+
+    cache = SemanticCache(embedder=embedder)
+    asyncio.run(cache.store("solar energy policy", "answer"))
+    calls.clear()
+
+    assert asyncio.run(cache.lookup("solar energy policy")) == "answer"
+    assert calls == []
+
+
+def test_similar_input_hits_and_unrelated_input_misses() -> None:
+    cache = SemanticCache(threshold=0.9, embedder=bag_of_words)
+    asyncio.run(cache.store("solar energy policy", "answer"))
+
+    assert asyncio.run(cache.lookup("Solar energy policy  ")) == "answer"
+    assert asyncio.run(cache.lookup("water storage")) is None
+
+
+def test_similar_input_only_hits_within_its_partition() -> None:
+    cache = SemanticCache(threshold=0.9, embedder=bag_of_words)
+    asyncio.run(cache.store("solar energy policy", "answer", partition="a"))
+
+    assert asyncio.run(cache.lookup("Solar energy policy", partition="a")) == "answer"
+    assert asyncio.run(cache.lookup("Solar energy policy", partition="b")) is None
+
+
+def test_entries_expire_and_evict(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = SemanticCache(ttl=10, maxsize=2, embedder=bag_of_words)
+
+    async def fill() -> None:
+        for text, value in [("solar", "a"), ("wind", "b"), ("water", "c")]:
+            await cache.store(text, value)
+
+    asyncio.run(fill())
+
+    assert asyncio.run(cache.lookup("solar")) is None
+    assert asyncio.run(cache.lookup("wind")) == "b"
+    now[0] += 11
+    assert asyncio.run(cache.lookup("wind")) is None
+
+
+def test_concurrent_lookups_share_one_embedding_batch() -> None:
+    batches: list[list[str]] = []
+
+    def embedder(texts: list[str]) -> np.ndarray:
+        batches.append(texts)
+        return bag_of_words(texts)
+
+    cache = SemanticCache(embedder=embedder)
+    asyncio.run(cache.store("solar energy", "answer"))
+    batches.clear()
+
+    async def lookup_all() -> list:
+        queries = ["solar energy policy", "wind storage", "water"]
+        return await asyncio.gather(*(cache.lookup(q) for q in queries))
+
+    assert asyncio.run(lookup_all()) == [None, None, None]
+    assert len(batches) == 1
+    assert sorted(batches[0]) == ["solar energy policy", "water", "wind storage"]
+
+
+def cached_model(cache: SemanticCache, calls: list[str]):
+    """A fake model call wrapped in the response cache callbacks."""
+    from google.adk.models import LlmRequest, LlmResponse
+    from google.genai import types
+
+    async def call_model(agent_name: str, *turns: str, scope: str = "") -> LlmResponse:
+        context = SimpleNamespace(agent_name=agent_name, state={CACHE_SCOPE_KEY: scope})
+        request = LlmRequest(
+            contents=[
+                types.Content(role="user", parts=[types.Part(text=turn)])
+                for turn in turns
+            ]
+        )
+        cached = await cache.before_model(context, request)
+        if cached is not None:
+            return cached
+        calls.append(turns[-1])
+        response = LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=turns[-1])])
+        )
+        await cache.after_model(context, response)
+        return response
+
+    return call_model
+
+
+def test_response_cache_reuses_responses_to_similar_problems() -> None:
+    calls: list[str] = []
+    call_model = cached_model(SemanticCache(embedder=bag_of_words), calls)
+
+    async def run_all() -> list:
+        return [
+            await call_model("collector", "solar energy policy"),
+            await call_model("collector", "Solar energy  policy"),
+            await call_model("collector", "water storage"),
+            await call_model("scorer", "solar energy policy"),
+            await call_model("collector", "solar energy policy", scope="/solver:1"),
+        ]
+
+    first, second, *_ = asyncio.run(run_all())
+
+    assert second is first
+    assert (
+        calls == ["solar energy policy", "water storage"] + ["solar energy policy"] * 2
+    )
+
+
+def test_response_cache_matches_later_turns_exactly() -> None:
+    """A follow-up call (e.g. after a tool result) never reuses the call before it."""
+    calls: list[str] = []
+    call_model = cached_model(SemanticCache(embedder=bag_of_words), calls)
+
+    async def run_all() -> None:
+        await call_model("collector", "solar energy policy", "wind")
+        await call_model("collector", "solar energy policy", "wind", "storage")
+        await call_model("collector", "solar energy policy", "wind")
+
+    asyncio.run(run_all())
+
+    assert calls == ["wind", "storage"]
+
+
+def test_parallel_agents_share_one_embedding_batch() -> None:
+    """Lookups from agents running side by side in the DAG embed together."""
+    batches: list[list[str]] = []
+
+    def embedder(texts: list[str]) -> np.ndarray:
+        batches.append(texts)
+        return bag_of_words(texts)
+
+    calls: list[str] = []
+    call_model = cached_model(SemanticCache(embedder=embedder), calls)
+
+    async def run_all() -> None:
+        await call_model("simulation", "solar energy")
+        await call_model("scoring", "solar energy")
+        batches.clear()
+        await asyncio.gather(
+            call_model("simulation", "wind energy"),
+            call_model("scoring", "water storage"),
+        )
+
+    asyncio.run(run_all())
+
+    assert len(batches) == 1
+    assert sorted(batches[0]) == ["water storage", "wind energy"]
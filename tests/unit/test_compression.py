@@ -0,0 +1,84 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from app.utils import compression
+from app.utils.compression import compress_prompt, extractive_summary
+
+
+def test_extractive_summary_keeps_informative_sentences_in_order() -> None:
+    """Filler is dropped and the kept sentences stay in their original order."""
+    text = (
+        "Solar capacity grew forty percent in Spain last year. "
+        "That is it. "
+        "Grid storage costs fell below battery parity in Texas. "
+        "It was so."
+    )
+
+    assert extractive_summary(text, ratio=0.5) == (
+        "Solar capacity grew forty percent in Spain last year.\n"
+        "Grid storage costs fell below battery parity in Texas."
+    )
+
+
+def test_extractive_summary_returns_short_text_unchanged() -> None:
+    assert extractive_summary("Only one sentence here.") == "Only one sentence here."
+
+
+ROLE_LIST = "\n".join(
+    [
+        "## Required roles",
+        "This problem spans several disciplines. It is what it is.",
+        *(
+            f"{i}. **{role}**: Needed because the plan is what it is."
+            for i, role in enumerate(
+                [
+                    "Technical Expert",
+                    "Domain Specialist",
+                    "UX Consultant",
+                    "Regulatory Advisor",
+                    "Strategy Analyst",
+                    "Data Scientist",
+                    "Financial Analyst",
+                    "Security Architect",
+                ],
+                start=1,
+            )
+        ),
+        "Grid operators in Texas reported record battery storage deployments.",
+        "That was so. It was so. And so it went.",
+    ]
+)
+
+
+def test_extractive_summary_keeps_headings_and_list_items() -> None:
+    summary = extractive_summary(ROLE_LIST, ratio=0.3)
+
+    for line in ROLE_LIST.splitlines():
+        if line.startswith(("#", "1", "2", "3", "4", "5", "6", "7", "8")):
+            assert line in summary
+    assert "battery storage" in summary
+    assert "It was so." not in summary
+
+
+def test_compress_prompt_passes_text_through_without_llmlingua(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The lossy extractive fallback only runs when asked for."""
+    monkeypatch.setattr(compression, "get_compressor", lambda: None)
+    text = "\n".join([ROLE_LIST] * 10)
+
+    assert compress_prompt(text) == text
+    assert len(compress_prompt(text, extractive=True)) < len(text)
@@ -0,0 +1,256 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import io
+import json
+import time
+import warnings
+from pathlib import Path
+from types import ModuleType
+
+import numpy as np
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+pd = pytest.importorskip("pandas")
+
+
+def load_dashboard() -> ModuleType:
+    """Import streamlit_ui/app.py, which isn't part of the app package."""
+    path = Path(__file__).parents[2] / "streamlit_ui" / "app.py"
+    spec = importlib.util.spec_from_file_location("dashboard", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+dashboard = load_dashboard()
+
+
+def web_chunk(domain: str) -> dict:
+    return {"web": {"domain": domain, "title": f"{domain} article", "uri": "https://x"}}
+
+
+DOMAINS = ["nrel.gov", "iea.org", "nrel.gov", "a.com", "b.com", "c.io", "d.edu"]
+
+SESSION = {
+    "events": [
+        {
+            "id": "evt-1",
+            "author": "user",
+            "timestamp": 1700000000.0,
+            "content": {"role": "user", "parts": [{"text": "Plan a solar rollout"}]},
+        },
+        {
+            "id": "evt-2",
+            "author": "data_collector_agent",
+            "timestamp": 1700000002.5,
+            "invocationId": "inv-1",
+            "content": {"role": "model", "parts": [{"text": "Facts"}, {"text": "!"}]},
+            "groundingMetadata": {
+                "groundingChunks": [web_chunk(domain) for domain in DOMAINS],
+                "groundingSupports": [{"groundingChunkIndices": [0]}],
+                "webSearchQueries": ["solar capacity 2024"],
+            },
+        },
+        {
+            "id": "evt-3",
+            "author": "some_new_agent",
+            "timestamp": 1700000005.0,
+            "content": {"role": "model", "parts": [{"text": "Done"}]},
+        },
+    ]
+}
+
+
+@pytest.fixture
+def session_file(tmp_path: Path) -> Path:
+    path = tmp_path / "session.json"
+    path.write_text(json.dumps(SESSION))
+    return path
+
+
+def test_extractor_builds_its_bundle_once(session_file: Path) -> None:
+    extractor = dashboard.Event_Extractor(json_file_path=str(session_file))
+
+    bundle = extractor.extract_bundle()
+
+    assert extractor.extract_bundle() is bundle
+    assert extractor.get_event_summary() is bundle.summary
+    assert extractor.extract_all_events() is bundle.events
+
+
+def test_load_extractor_parses_uploads_once() -> None:
+    upload = json.dumps(SESSION).encode()
+
+    extractor = dashboard.load_extractor(upload)
+
+    assert extractor._bundle is not None
+    assert dashboard.load_extractor(upload) is extractor
+    dashboard.load_extractor.clear()
+
+
+def test_summary_has_one_row_per_event() -> None:
+    summary = dashboard.Event_Extractor(json_data=SESSION).get_event_summary()
+
+    assert summary["ID"].tolist() == ["evt-1", "evt-2", "evt-3"]
+    assert summary["Timestamp"].tolist() == [1700000000.0, 1700000002.5, 1700000005.0]
+    assert summary["Content_Length"].tolist() == [20, 6, 4]
+    assert summary["Grounding_Chunks_Count"].tolist() == [0, 7, 0]
+    assert summary["Grounding_Supports_Count"].tolist() == [0, 1, 0]
+    assert summary["Search_Queries_Count"].tolist() == [0, 1, 0]
+
+
+def test_html_table_escapes_brackets_and_newlines() -> None:
+    text = "<b>plan</b>\nnext"
+
+    assert text.translate(dashboard._HTML_TABLE) == "&lt;b&gt;plan&lt;/b&gt;<br>next"
+
+
+def test_stream_events_keeps_only_the_events_array() -> None:
+    if dashboard.ijson is None:
+        pytest.skip("ijson is not installed")
+    document = {"id": "session-1", "state": {"large": "x" * 1024}, **SESSION}
+
+    parsed = dashboard._stream_events(io.BytesIO(json.dumps(document).encode()))
+
+    assert parsed == {"events": SESSION["events"]}
+
+
+def test_source_usage_counts_every_grounding_domain() -> None:
+    extractor = dashboard.Event_Extractor(json_data=SESSION)
+
+    bundle = extractor.extract_bundle()
+
+    assert bundle.source_usage.most_common(1) == [("nrel.gov", 2)]
+    assert sum(bundle.source_usage.values()) == len(DOMAINS)
+    assert bundle.sources == sorted(set(DOMAINS))
+
+
+def test_summary_uses_arrow_dtypes() -> None:
+    summary = dashboard.Event_Extractor(json_data=SESSION).get_event_summary()
+
+    extracted = summary[["ID", "Author", "Role", "Timestamp", "Content_Length"]]
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in extracted.dtypes)
+
+
+def test_format_timestamps_renders_seconds_as_dates() -> None:
+    summary = dashboard.Event_Extractor(json_data=SESSION).get_event_summary()
+
+    formatted = dashboard.format_timestamps(summary["Timestamp"])
+
+    assert formatted.str.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d").all()
+
+
+def test_summary_carries_author_names_and_colors() -> None:
+    summary = dashboard.Event_Extractor(json_data=SESSION).get_event_summary()
+
+    assert summary["Author_Pretty"].tolist() == [
+        "User",
+        "Data Collector Agent",
+        "Some New Agent",
+    ]
+    assert summary["Author_Color"].tolist() == [
+        dashboard.AGENT_COLORS["user"],
+        dashboard.AGENT_COLORS["data_collector_agent"],
+        dashboard.DEFAULT_AGENT_COLOR,
+    ]
+
+
+def test_first_event_is_extracted_without_the_bundle() -> None:
+    extractor = dashboard.Event_Extractor(json_data=SESSION)
+
+    first = extractor.extract_first_event()
+
+    assert first["content_parts"] == ["Plan a solar rollout"]
+    assert extractor._bundle is None
+
+
+def test_events_keep_only_a_grounding_preview() -> None:
+    extractor = dashboard.Event_Extractor(json_data=SESSION)
+
+    event = extractor.extract_all_events()[1]
+
+    assert len(event["grounding_chunks_preview"]) == dashboard.GROUNDING_PREVIEW_SIZE
+    assert event["grounding_chunks_count"] == len(DOMAINS)
+    eager = extractor.extract_all_events(eager=True)[1]
+    assert len(eager["grounding_chunks"]) == len(DOMAINS)
+
+
+def test_workflow_chart_tolerates_missing_timestamps() -> None:
+    events = [dict(event) for event in SESSION["events"]]
+    del events[0]["timestamp"]
+    summary = dashboard.Event_Extractor(json_data={"events": events})
+    summary = summary.get_event_summary()
+
+    fig = dashboard.create_agent_workflow_chart(summary)
+
+    x = fig.data[0].x
+    assert np.isnan(x[0])
+    assert list(x[1:]) == [0.0, 2.5]
+
+
+def test_format_timestamps_uses_each_dates_own_offset(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        # 2024-01-15 and 2024-07-15, both 12:00 UTC
+        seconds = pd.Series([1705320000.0, 1721044800.0])
+
+        formatted = dashboard.format_timestamps(seconds)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert formatted.tolist() == ["2024-01-15 07:00:00", "2024-07-15 08:00:00"]
+
+
+def test_summary_to_csv_round_trips() -> None:
+    summary = dashboard.Event_Extractor(json_data=SESSION).get_event_summary()
+    summary = summary.drop(columns=dashboard.PRESENTATION_COLUMNS)
+
+    parsed = pd.read_csv(io.BytesIO(dashboard.summary_to_csv(summary)))
+
+    assert parsed.columns.tolist() == summary.columns.tolist()
+    assert parsed["ID"].tolist() == ["evt-1", "evt-2", "evt-3"]
+    assert parsed["Timestamp"].tolist() == [1700000000.0, 1700000002.5, 1700000005.0]
+
+
+def test_summary_to_csv_uses_arrows_dialect() -> None:
+    if dashboard.pa is None:
+        pytest.skip("pyarrow is not installed")
+    summary = dashboard.Event_Extractor(json_data=SESSION).get_event_summary()
+    summary = summary.drop(columns=dashboard.PRESENTATION_COLUMNS)
+
+    header, first_row = dashboard.summary_to_csv(summary).decode().splitlines()[:2]
+
+    assert header.startswith('"ID","Author"')
+    assert first_row.startswith('"evt-1","user",')
+    assert "1700000000," in first_row
+    assert "1700000000.0" not in first_row
+
+
+def test_unknown_authors_get_the_default_color() -> None:
+    events = [{**event, "author": "brand_new_agent"} for event in SESSION["events"]]
+    extractor = dashboard.Event_Extractor(json_data={"events": events})
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        summary = extractor.get_event_summary()
+
+    assert summary["Author_Color"].tolist() == [dashboard.DEFAULT_AGENT_COLOR] * 3
@@ -0,0 +1,107 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from app.utils.llm import HTTP2_AVAILABLE, SharedClientGemini
+
+RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": "ok"}]},
+                "finishReason": "STOP",
+            }
+        ]
+    }
+).encode()
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answers every generateContent call and keeps the connection open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def gemini_api(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Point the Gemini API client at a local keep-alive server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("GOOGLE_GENAI_USE_VERTEXAI", "False")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv(
+        "GOOGLE_GEMINI_BASE_URL", f"http://127.0.0.1:{server.server_port}"
+    )
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+async def generate(model: SharedClientGemini) -> str:
+    request = LlmRequest(
+        model=model.model,
+        contents=[types.Content(role="user", parts=[types.Part(text="hi")])],
+        config=types.GenerateContentConfig(),
+    )
+    async for response in model.generate_content_async(request):
+        return response.content.parts[0].text
+    raise AssertionError("no response")
+
+
+def test_shared_client_uses_one_pooled_httpx_client(gemini_api: None) -> None:
+    """Async calls go through our httpx transport, even with aiohttp installed."""
+    model = SharedClientGemini(model="gemini-2.5-flash")
+
+    async def client_twice() -> tuple:
+        return model.api_client, model.api_client
+
+    first, second = asyncio.run(client_twice())
+
+    api_client = first._api_client
+    assert first is second
+    assert not api_client._use_aiohttp()
+    transport = api_client._async_httpx_client._transport
+    assert isinstance(transport, httpx.AsyncHTTPTransport)
+    assert transport._pool._http2 is HTTP2_AVAILABLE
+    assert transport._pool._max_connections == 32
+
+
+def test_shared_client_survives_a_new_event_loop(gemini_api: None) -> None:
+    """Runner.run starts a new loop per call; pooled connections can't follow."""
+    model = SharedClientGemini(model="gemini-2.5-flash")
+
+    assert asyncio.run(generate(model)) == "ok"
+    assert asyncio.run(generate(model)) == "ok"
+    assert not model._clients
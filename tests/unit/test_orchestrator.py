@@ -0,0 +1,252 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app.orchestrator import (
+    ParallelDAGAgent,
+    ParallelEarlyTerminationAgent,
+    apply_event,
+    fork_session,
+)
+
+LOG: list[str] = []
+
+
+class RecordingAgent(BaseAgent):
+    """Writes its name to state after a short delay and logs what it saw."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        LOG.append(f"start:{self.name}:{sorted(ctx.session.state)}")
+        await asyncio.sleep(0.05)
+        LOG.append(f"end:{self.name}")
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            actions=EventActions(state_delta={self.name: f"{self.name} done"}),
+        )
+
+
+class SampleAgent(BaseAgent):
+    """Answers with the next scripted (delay, answer) pair on every run."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        delay, answer = SCRIPT.pop(0)
+        await asyncio.sleep(delay)
+        LOG.append(answer)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            actions=EventActions(state_delta={"answer": answer}),
+        )
+
+
+SCRIPT: list[tuple[float, str]] = []
+
+
+class StreamingAgent(BaseAgent):
+    """Streams two partial chunks before its final event."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        for chunk in ("par", "tial"):
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                partial=True,
+                content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+            )
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            actions=EventActions(state_delta={self.name: "partial"}),
+        )
+
+
+def run_agent(agent: BaseAgent) -> dict:
+    """Run the agent once and return the final session state."""
+    session_service = InMemorySessionService()
+    session = session_service.create_session_sync(user_id="user", app_name="test")
+    runner = Runner(agent=agent, session_service=session_service, app_name="test")
+    message = types.Content(role="user", parts=[types.Part.from_text(text="go")])
+    list(runner.run(new_message=message, user_id="user", session_id=session.id))
+    return session_service.get_session_sync(
+        app_name="test", user_id="user", session_id=session.id
+    ).state
+
+
+def test_dag_runs_independent_nodes_concurrently() -> None:
+    """Fan-out nodes start together and the join waits for both."""
+    LOG.clear()
+    dag = ParallelDAGAgent(
+        name="dag",
+        sub_agents=[RecordingAgent(name=n) for n in ("a", "b", "c", "d")],
+        dependencies={"b": ["a"], "c": ["a"], "d": ["b", "c"]},
+    )
+
+    state = run_agent(dag)
+
+    assert state == {n: f"{n} done" for n in ("a", "b", "c", "d")}
+    assert LOG[:2] == ["start:a:[]", "end:a"]
+    assert set(LOG[2:4]) == {"start:b:['a']", "start:c:['a']"}
+    assert LOG[-2:] == ["start:d:['a', 'b', 'c']", "end:d"]
+
+
+def test_dag_forwards_streamed_chunks() -> None:
+    """Partial events reach the runner and downstream nodes still see state."""
+    LOG.clear()
+    dag = ParallelDAGAgent(
+        name="dag",
+        sub_agents=[StreamingAgent(name="a"), RecordingAgent(name="b")],
+        dependencies={"b": ["a"]},
+    )
+    session_service = InMemorySessionService()
+    session = session_service.create_session_sync(user_id="user", app_name="test")
+    runner = Runner(agent=dag, session_service=session_service, app_name="test")
+    message = types.Content(role="user", parts=[types.Part.from_text(text="go")])
+
+    events = list(
+        runner.run(new_message=message, user_id="user", session_id=session.id)
+    )
+
+    assert [e.partial for e in events if e.author == "a"] == [True, True, None]
+    assert LOG[0] == "start:b:['a']"
+
+
+def test_dag_rejects_cycles_and_unknown_nodes() -> None:
+    """Invalid graphs fail when the agent is built, not when it runs."""
+    with pytest.raises(ValueError, match="cycle"):
+        ParallelDAGAgent(
+            name="dag",
+            sub_agents=[RecordingAgent(name=n) for n in ("a", "b")],
+            dependencies={"a": ["b"], "b": ["a"]},
+        )
+    with pytest.raises(ValueError, match="unknown"):
+        ParallelDAGAgent(
+            name="dag",
+            sub_agents=[RecordingAgent(name="a")],
+            dependencies={"a": ["missing"]},
+        )
+
+
+def test_early_termination_keeps_first_valid_run() -> None:
+    """The fastest valid run wins and slower runs are cancelled."""
+    LOG.clear()
+    SCRIPT[:] = [(0.05, "slow ok"), (0.01, "fast bad"), (0.03, "medium ok")]
+    sampler = ParallelEarlyTerminationAgent(
+        name="sampler",
+        sub_agents=[SampleAgent(name="pipeline")],
+        n=3,
+        validator=lambda state: state["answer"].endswith("ok"),
+    )
+
+    state = run_agent(sampler)
+
+    assert state == {"answer": "medium ok"}
+    assert LOG == ["fast bad", "medium ok"]
+
+
+def test_aggregate_votes_across_all_runs() -> None:
+    """In aggregate mode the answer the runs agree on wins."""
+    SCRIPT[:] = [
+        (0.01, "wind power"),
+        (0.02, "solar power plan"),
+        (0.03, "solar power"),
+    ]
+    sampler = ParallelEarlyTerminationAgent(
+        name="sampler",
+        sub_agents=[SampleAgent(name="pipeline")],
+        n=3,
+        aggregate=True,
+        vote_key="answer",
+    )
+
+    assert run_agent(sampler) == {"answer": "solar power"}
+
+
+def test_fork_session_isolates_state_and_events() -> None:
+    """Events applied to a fork never reach the original session."""
+    session = InMemorySessionService().create_session_sync(
+        user_id="user", app_name="test", state={"a": "1"}
+    )
+    fork = fork_session(session)
+
+    apply_event(
+        fork,
+        Event(author="b", actions=EventActions(state_delta={"b": "2"})),
+    )
+
+    assert session.state == {"a": "1"} and session.events == []
+    assert fork.state == {"a": "1", "b": "2"} and len(fork.events) == 1
+
+
+OUTPUTS: dict[str, tuple[float, str]] = {}
+
+
+class EchoAgent(BaseAgent):
+    """Writes its scripted (delay, output) pair and logs the state it read."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        LOG.append(f"start:{self.name}:{ctx.session.state.get('b')}")
+        delay, output = OUTPUTS[self.name]
+        await asyncio.sleep(delay)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            actions=EventActions(state_delta={self.name: output}),
+        )
+
+
+def speculative_dag() -> ParallelDAGAgent:
+    return ParallelDAGAgent(
+        name="dag",
+        sub_agents=[EchoAgent(name=n) for n in ("a", "b", "c")],
+        dependencies={"b": ["a"], "c": ["b"]},
+        speculations={"c": {"b": "a"}},
+    )
+
+
+@pytest.mark.parametrize(
+    ("b_output", "reruns"),
+    [("solar power plan", []), ("wind farm", ["start:c:wind farm"])],
+)
+def test_speculative_node_is_kept_only_if_its_guess_holds(
+    b_output: str, reruns: list[str]
+) -> None:
+    """c starts on a's output in place of b's and reruns if b disagrees."""
+    LOG.clear()
+    OUTPUTS.update(a=(0, "solar power plan"), b=(0.05, b_output), c=(0, "report"))
+
+    state = run_agent(speculative_dag())
+
+    assert state == {"a": "solar power plan", "b": b_output, "c": "report"}
+    assert LOG[0] == "start:a:None"
+    assert set(LOG[1:3]) == {"start:b:None", "start:c:solar power plan"}
+    assert LOG[3:] == reruns
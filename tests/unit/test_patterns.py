@@ -0,0 +1,35 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from app.utils import patterns
+from app.utils.patterns import PatternScanner
+
+SIGNALS = {"no_conflicts": r"no conflicts", "conflict": r"conflict"}
+
+
+@pytest.mark.parametrize("use_hyperscan", [True, False])
+def test_scan_reports_every_matching_pattern(
+    monkeypatch: pytest.MonkeyPatch, use_hyperscan: bool
+) -> None:
+    if use_hyperscan and patterns.hyperscan is None:
+        pytest.skip("hyperscan not installed")
+    if not use_hyperscan:
+        monkeypatch.setattr(patterns, "hyperscan", None)
+    scanner = PatternScanner(SIGNALS)
+
+    assert scanner.scan("There are NO CONFLICTS.") == {"no_conflicts", "conflict"}
+    assert scanner.scan("One conflict remains") == {"conflict"}
+    assert scanner.scan("All clear") == set()
@@ -0,0 +1,29 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from app.trust_kernels import cosine, token_ids, token_jaccard
+
+
+def test_cosine() -> None:
+    assert cosine(np.array([1.0, 0.0]), np.array([1.0, 1.0])) == pytest.approx(2**-0.5)
+    assert cosine(np.array([1.0, 0.0]), np.zeros(2)) == 0.0
+
+
+def test_token_jaccard() -> None:
+    assert token_jaccard(token_ids("Solar wind"), token_ids("wind water")) == 1 / 3
+    assert token_jaccard(token_ids("solar"), token_ids("SOLAR solar")) == 1.0
+    assert token_jaccard(token_ids(""), token_ids("")) == 1.0